@@ -0,0 +1,142 @@
+"""Measure cold start: process launch to the first successful chat response.
+
+Launches ``uvicorn backend.main:app`` on a free port and reports time to
+``/api/health`` answering and to the first ``/api/chat/stream`` that
+completes with a ``done`` event. The server inherits this environment, so
+compare configurations by setting e.g. ``VECTOR_INDEX=exact`` or
+``PROMPT_REFRESH_SECONDS=0``. The first run also writes the boot snapshots;
+later runs show the snapshot boot. Needs OPENAI_API_KEY and an ingested
+ChromaDB.
+
+``--profile`` instead prints the import-time breakdown of ``backend.main``
+(``python -X importtime``), grouped by top-level package.
+
+Usage:
+    cd backend && uv run python -m benchmarks.cold_start
+    cd backend && uv run python -m benchmarks.cold_start --runs 5 --question "What documents do you have?"
+    cd backend && uv run python -m benchmarks.cold_start --profile
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _first_response(base_url: str, question: str) -> bool:
+    """True once a chat stream reaches its ``done`` event."""
+    body = {"question": question, "stream_format": "compact"}
+    with httpx.stream("POST", f"{base_url}/api/chat/stream", json=body, timeout=60) as response:
+        event_name = ""
+        for line in response.iter_lines():
+            if line.startswith("event:"):
+                event_name = line[6:].strip()
+                continue
+            if not line.startswith("data:"):
+                if not line:
+                    event_name = ""  # end of message
+                continue
+            if event_name == "token":
+                continue  # compact token events carry just the text
+            event = json.loads(line[5:])
+            if event.get("type") == "error":
+                raise RuntimeError(event.get("content"))
+            if event.get("type") == "done":
+                return True
+    return False
+
+
+def _launch(question: str, timeout: float) -> tuple[float, float]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        healthy = None
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with code {server.returncode}")
+            try:
+                httpx.get(f"{base_url}/api/health", timeout=1).raise_for_status()
+                healthy = time.perf_counter() - start
+                break
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        if healthy is None:
+            raise RuntimeError(f"server not healthy after {timeout:.0f}s")
+        if not _first_response(base_url, question):
+            raise RuntimeError("chat stream ended without a done event")
+        return healthy, time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _profile() -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # -X importtime prints children before their parent, so backend.main's
+    # subtree is every line since the previous top-level import
+    self_us: Counter = Counter()
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        self_us[name.strip().split(".")[0]] += int(own)
+        if not name.startswith("  "):
+            if name.strip() == "backend.main":
+                total_us = int(cumulative)
+                break
+            self_us.clear()
+
+    print(f"import backend.main: {total_us / 1000:.0f}ms (self time by top-level package)")
+    for package, us in self_us.most_common(15):
+        print(f"  {package:<28} {us / 1000:>7.1f}ms  {us / total_us:>6.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark process launch to first chat response")
+    parser.add_argument("--question", default="What's the rate limit on the payments API?", help="Chat question")
+    parser.add_argument("--runs", type=int, default=3, help="Launches to measure (default: 3)")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for health (default: 120)")
+    parser.add_argument("--profile", action="store_true", help="Print the import-time breakdown instead")
+    args = parser.parse_args()
+
+    if args.profile:
+        _profile()
+        return
+
+    results = []
+    for i in range(args.runs):
+        healthy, first = _launch(args.question, args.timeout)
+        results.append((healthy, first))
+        print(f"  run {i + 1}: healthy {healthy * 1000:>6.0f}ms  first response {first * 1000:>6.0f}ms")
+    print(
+        f"p50: healthy {statistics.median(r[0] for r in results) * 1000:.0f}ms  "
+        f"first response {statistics.median(r[1] for r in results) * 1000:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
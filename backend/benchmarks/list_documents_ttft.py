@@ -0,0 +1,60 @@
+"""Compare time-to-first-token on the `list_documents` tool path.
+
+Runs the real pipeline (router + tool) for a list-the-docs question with the
+direct markdown render and with the LLM presentation step, and reports
+time to first token and total time. Needs OPENAI_API_KEY and an ingested
+ChromaDB.
+
+Usage:
+    cd backend && uv run python -m benchmarks.list_documents_ttft
+    cd backend && uv run python -m benchmarks.list_documents_ttft --runs 10 --question "which runbooks are there?"
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+import backend.rag_chain as rag_chain
+
+
+async def _measure(question: str) -> tuple[float, float, bool]:
+    start = time.perf_counter()
+    ttft = None
+    routed_to_tool = True
+    async for chunk in rag_chain.stream_rag_response(question):
+        if chunk["type"] == "token" and ttft is None:
+            ttft = time.perf_counter() - start
+        if chunk["type"] == "sources" and chunk["content"]:
+            routed_to_tool = False  # RAG answers carry sources; the tool path doesn't
+    return ttft or 0.0, time.perf_counter() - start, routed_to_tool
+
+
+async def _bench(mode: str, args) -> None:
+    rag_chain.LIST_DOCS_PRESENTATION = mode
+    results = [await _measure(args.question) for _ in range(args.runs)]
+    ttfts = [r[0] * 1000 for r in results]
+    totals = [r[1] * 1000 for r in results]
+    misrouted = sum(1 for r in results if not r[2])
+    print(
+        f"  {mode:<7} ttft p50={statistics.median(ttfts):>7.0f}ms  "
+        f"total p50={statistics.median(totals):>7.0f}ms  misrouted={misrouted}/{args.runs}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark list_documents time-to-first-token")
+    parser.add_argument("--question", default="What documents do you have?", help="List-the-docs question")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode (default: 5)")
+    args = parser.parse_args()
+
+    print(f"'{args.question}', {args.runs} runs per mode")
+    for mode in ("llm", "direct"):
+        asyncio.run(_bench(mode, args))
+
+
+if __name__ == "__main__":
+    main()
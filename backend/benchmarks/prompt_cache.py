@@ -0,0 +1,91 @@
+"""Compare the Hub and cache-friendly prompt layouts on TTFT, cache hits and input cost.
+
+Runs the same multi-turn conversations through the real pipeline with
+``PROMPT_LAYOUT=hub`` and ``PROMPT_LAYOUT=cache`` (optionally with pinned
+documents) and reports time to first token per turn, the share of input
+tokens served from the upstream prompt cache, and the input cost. Needs
+OPENAI_API_KEY and an ingested ChromaDB.
+
+OpenAI only caches prompts of 1024+ tokens and keeps them for a few minutes,
+so run the layouts back to back and expect hits from the second turn on.
+
+Usage:
+    cd backend && uv run python -m benchmarks.prompt_cache
+    cd backend && uv run python -m benchmarks.prompt_cache --sessions 5 --pinned standards/api-design-guidelines.md
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+import backend.prompt_layout as prompt_layout
+import backend.rag_chain as rag_chain
+from backend.config import LLM_MODEL
+
+CONVERSATION = [
+    "What's the rate limit on the payments API?",
+    "What happens when I exceed it?",
+    "Does the same limit apply to the users API?",
+    "How should clients retry after being rate limited?",
+]
+
+# USD per 1M input tokens (uncached, cached); list prices, update as they change
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.075),
+    "gpt-4o": (2.50, 1.25),
+    "gpt-4.1-mini": (0.40, 0.10),
+    "gpt-4.1": (2.00, 0.50),
+}
+
+
+async def _ttft(question: str, session_id: str) -> float:
+    start = time.perf_counter()
+    ttft = None
+    async for chunk in rag_chain.stream_rag_response(question, metadata={"thread_id": session_id}):
+        if chunk["type"] == "token" and ttft is None:
+            ttft = time.perf_counter() - start
+    return ttft or 0.0
+
+
+async def _bench(label: str, layout: str, pinned: list[str], args) -> None:
+    rag_chain.PROMPT_LAYOUT = layout
+    prompt_layout.PINNED_DOCS = pinned
+    before = dict(prompt_layout.prompt_cache_stats)
+
+    ttfts_by_turn = [[] for _ in CONVERSATION]
+    for _ in range(args.sessions):
+        session_id = f"bench-{uuid.uuid4()}"
+        for turn, question in enumerate(CONVERSATION):
+            ttfts_by_turn[turn].append(await _ttft(question, session_id) * 1000)
+
+    input_tokens = prompt_layout.prompt_cache_stats["input_tokens"] - before["input_tokens"]
+    cached = prompt_layout.prompt_cache_stats["cached_tokens"] - before["cached_tokens"]
+    uncached_price, cached_price = PRICES.get(LLM_MODEL, (0.0, 0.0))
+    cost = ((input_tokens - cached) * uncached_price + cached * cached_price) / 1_000_000
+
+    turns = "  ".join(f"t{i + 1}={statistics.median(t):>5.0f}ms" for i, t in enumerate(ttfts_by_turn))
+    ratio = cached / input_tokens if input_tokens else 0.0
+    print(f"  {label:<13} ttft p50 {turns}  cached={ratio:>6.1%} of {input_tokens} tokens  input cost=${cost:.5f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark prompt layouts against upstream prompt caching")
+    parser.add_argument("--sessions", type=int, default=3, help="Conversations per layout (default: 3)")
+    parser.add_argument("--pinned", default="", help="Comma-separated sources to pin in the cache layout")
+    args = parser.parse_args()
+    pinned = [s.strip() for s in args.pinned.split(",") if s.strip()]
+
+    print(f"{args.sessions} sessions x {len(CONVERSATION)} turns per layout, model {LLM_MODEL}")
+    asyncio.run(_bench("hub", "hub", [], args))
+    asyncio.run(_bench("cache", "cache", [], args))
+    if pinned:
+        asyncio.run(_bench("cache+pinned", "cache", pinned, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark query embedding with and without micro-batching + caching.
+
+Uses a fake embeddings backend with a fixed per-request latency so the
+numbers reflect request fan-out rather than network noise. Reports
+throughput, upstream request count and per-caller latency.
+
+Usage:
+    cd backend && uv run python -m benchmarks.query_embeddings
+    cd backend && uv run python -m benchmarks.query_embeddings --concurrency 500 --unique 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+from backend.query_embeddings import QueryEmbeddingService
+
+
+class FakeEmbeddings(Embeddings):
+    """Counts upstream calls; each call costs *latency_ms* plus a little per text."""
+
+    def __init__(self, latency_ms: float, dims: int = 1536) -> None:
+        self.latency = latency_ms / 1000
+        self.dims = dims
+        self.requests = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> list[float]:
+        raise NotImplementedError
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.requests += 1
+        await asyncio.sleep(self.latency + 0.0002 * len(texts))
+        return [[float(len(t))] * self.dims for t in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+async def _run(label: str, embedder: Embeddings, backend: FakeEmbeddings, questions: list[str]) -> None:
+    latencies = []
+
+    async def one(question: str) -> None:
+        start = time.perf_counter()
+        await embedder.aembed_query(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in questions))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"  {label:<10} queries/s={len(questions) / wall:>8.0f}  upstream_requests={backend.requests:>5}  "
+        f"p50={statistics.median(latencies):>6.1f}ms  p99={p99:>6.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark query embedding batching")
+    parser.add_argument("--concurrency", type=int, default=300, help="Concurrent questions (default: 300)")
+    parser.add_argument("--unique", type=int, default=150, help="Distinct questions among them (default: 150)")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Fake upstream latency (default: 40)")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="Batching window (default: 5)")
+    args = parser.parse_args()
+
+    pool = [f"question number {i} about the payments API" for i in range(args.unique)]
+    questions = [random.choice(pool) for _ in range(args.concurrency)]
+    print(f"{args.concurrency} concurrent questions ({args.unique} distinct), {args.latency_ms}ms upstream latency")
+
+    backend = FakeEmbeddings(args.latency_ms)
+    asyncio.run(_run("direct", backend, backend, questions))
+
+    backend = FakeEmbeddings(args.latency_ms)
+    service = QueryEmbeddingService(backend, window_ms=args.window_ms)
+    asyncio.run(_run("batched", service, backend, questions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark SSE encoding overhead for the chat stream.
+
+Drives many concurrent fake token streams through the same coalescing and
+encoding path as `/api/chat/stream` and reports events/sec and CPU per stream.
+
+Usage:
+    cd backend && uv run python -m benchmarks.sse_stream
+    cd backend && uv run python -m benchmarks.sse_stream --streams 500 --tokens 400 --token-delay-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from sse_starlette.sse import ServerSentEvent
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+from backend.streaming import coalesce_tokens, encode_event
+
+TOKEN = "tok "
+
+
+async def _fake_rag_stream(n_tokens: int, delay_s: float):
+    for _ in range(n_tokens):
+        if delay_s:
+            await asyncio.sleep(delay_s)
+        yield {"type": "token", "content": TOKEN}
+    yield {"type": "sources", "content": [{"file": "api/payments-api.md", "snippet": "..."}]}
+    yield {"type": "done"}
+
+
+async def _run_stream(mode: str, args) -> tuple[int, int]:
+    source = _fake_rag_stream(args.tokens, args.token_delay_ms / 1000)
+    events = 0
+    n_bytes = 0
+    if mode == "baseline":
+        async for chunk in source:
+            n_bytes += len(ServerSentEvent(data=json.dumps(chunk)).encode())
+            events += 1
+        return events, n_bytes
+
+    stream_format = "compact" if mode == "compact" else "json"
+    async for chunk in coalesce_tokens(source, args.chars, args.ms):
+        n_bytes += len(ServerSentEvent(**encode_event(chunk, stream_format)).encode())
+        events += 1
+    return events, n_bytes
+
+
+async def _bench(mode: str, args) -> None:
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    results = await asyncio.gather(*(_run_stream(mode, args) for _ in range(args.streams)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    events = sum(r[0] for r in results)
+    n_bytes = sum(r[1] for r in results)
+    print(
+        f"  {mode:<10} events={events:>8}  events/s={events / wall:>10.0f}  "
+        f"bytes/stream={n_bytes // args.streams:>7}  "
+        f"cpu/stream={cpu / args.streams * 1000:>7.3f}ms  wall={wall:.2f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark SSE token streaming")
+    parser.add_argument("--streams", type=int, default=200, help="Concurrent streams (default: 200)")
+    parser.add_argument("--tokens", type=int, default=300, help="Tokens per stream (default: 300)")
+    parser.add_argument("--token-delay-ms", type=float, default=1.0, help="Delay between tokens (default: 1.0)")
+    parser.add_argument("--chars", type=int, default=32, help="Coalesce flush size in chars (default: 32)")
+    parser.add_argument("--ms", type=int, default=30, help="Coalesce flush interval in ms (default: 30)")
+    args = parser.parse_args()
+
+    print(f"{args.streams} streams x {args.tokens} tokens, {args.token_delay_ms}ms between tokens")
+    for mode in ("baseline", "coalesced", "compact"):
+        asyncio.run(_bench(mode, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark in-process vector search against a Chroma collection.
+
+Loads clustered random unit vectors into a throwaway Chroma collection, snapshots it,
+and compares per-query latency and recall@k (vs. exact search) for Chroma,
+the exact in-process index and the IVF index.
+
+Usage:
+    cd backend && uv run python -m benchmarks.vector_index
+    cd backend && uv run python -m benchmarks.vector_index --rows 200000 --nprobe 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+from backend.vector_index import VectorIndex
+
+
+def _recall(results: list[list[int]], truth: list[list[int]]) -> float:
+    hits = sum(len(set(r) & set(t)) for r, t in zip(results, truth))
+    return hits / sum(len(t) for t in truth)
+
+
+def _time_per_query(fn, queries) -> tuple[list, float]:
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, statistics.median(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark in-process vector index vs Chroma")
+    parser.add_argument("--rows", type=int, default=20000, help="Vectors in the corpus (default: 20000)")
+    parser.add_argument("--dims", type=int, default=1536, help="Vector dimensions (default: 1536)")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries (default: 200)")
+    parser.add_argument("-k", type=int, default=4, help="Results per query (default: 4)")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists probed per query (default: 8)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    # Clustered corpus: chunks of a doc sit near each other, like real embeddings
+    centers = rng.standard_normal((max(args.rows // 50, 1), args.dims), dtype=np.float32)
+    vectors = centers[rng.integers(len(centers), size=args.rows)]
+    vectors += 0.6 * rng.standard_normal((args.rows, args.dims), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Queries near real rows, like questions near the chunk that answers them
+    queries = vectors[rng.choice(args.rows, args.queries)] + 0.05 * rng.standard_normal((args.queries, args.dims), dtype=np.float32)
+
+    print(f"{args.rows} x {args.dims} corpus, {args.queries} queries, k={args.k}")
+    with tempfile.TemporaryDirectory() as tmp:
+        collection = chromadb.PersistentClient(path=tmp).create_collection("bench", embedding_function=None)
+        ids = [str(i) for i in range(args.rows)]
+        for i in range(0, args.rows, 5000):
+            collection.add(
+                ids=ids[i:i + 5000],
+                embeddings=vectors[i:i + 5000],
+                documents=ids[i:i + 5000],
+                metadatas=[{"row": int(r)} for r in ids[i:i + 5000]],
+            )
+
+        start = time.perf_counter()
+        exact = VectorIndex.from_collection(collection)
+        print(f"  snapshot load: {(time.perf_counter() - start) * 1000:.0f}ms")
+        start = time.perf_counter()
+        ivf = VectorIndex(exact.vectors, exact.documents, exact.metadatas, kind="ivf", nprobe=args.nprobe)
+        print(f"  ivf build:     {(time.perf_counter() - start) * 1000:.0f}ms ({len(ivf._lists)} lists)")
+
+        truth, exact_ms = _time_per_query(
+            lambda q: [int(d.page_content) for d in exact.search(q, args.k)], queries
+        )
+        chroma, chroma_ms = _time_per_query(
+            lambda q: [int(i) for i in collection.query(query_embeddings=[q], n_results=args.k)["ids"][0]],
+            queries,
+        )
+        ivf_res, ivf_ms = _time_per_query(
+            lambda q: [int(d.page_content) for d in ivf.search(q, args.k)], queries
+        )
+
+        async def batched() -> float:
+            start = time.perf_counter()
+            await asyncio.gather(*(exact.asearch(q, args.k) for q in queries))
+            return (time.perf_counter() - start) * 1000 / len(queries)
+
+        batched_ms = asyncio.run(batched())
+
+        print(f"  {'chroma':<14} p50={chroma_ms:>7.3f}ms  recall@{args.k}={_recall(chroma, truth):.3f}")
+        print(f"  {'exact':<14} p50={exact_ms:>7.3f}ms  recall@{args.k}=1.000")
+        print(f"  {'exact batched':<14} avg={batched_ms:>7.3f}ms  recall@{args.k}=1.000")
+        print(f"  {'ivf':<14} p50={ivf_ms:>7.3f}ms  recall@{args.k}={_recall(ivf_res, truth):.3f}")
+
+
+if __name__ == "__main__":
+    main()
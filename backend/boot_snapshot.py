@@ -0,0 +1,159 @@
+"""Local snapshots that let the server boot without waiting on the network.
+
+Two things used to be fetched on the first request:
+
+- the Hub prompt + model, pulled from LangSmith on every request
+- the document catalog behind ``list_documents``, rebuilt by scanning every
+  chunk's metadata in Chroma
+
+Both are now kept as JSON under ``BOOT_SNAPSHOT_DIR`` (written atomically
+with ``os.replace``) and restored at startup. The chain is serialized with
+``langchain_core.load``, which stores API keys as environment references,
+never their values. The catalog is keyed by collection version, so a
+blue/green switch never serves a stale list.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import warnings
+from typing import Any, Callable
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.load import dumps, loads
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.config import BOOT_SNAPSHOT_DIR, PROMPT_REFRESH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def _path(name: str) -> str:
+    return os.path.join(os.path.abspath(BOOT_SNAPSHOT_DIR), re.sub(r"[^\w.-]", "_", name) + ".json")
+
+
+def _write(name: str, text: str) -> None:
+    path = _path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _read(name: str) -> str | None:
+    try:
+        with open(_path(name)) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _load_chain(prompt_ref: str, text: str) -> Any | None:
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", LangChainBetaWarning)
+            return loads(text)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable prompt snapshot for {prompt_ref}: {e}")
+        return None
+
+
+def catalog_from_metadatas(metadatas: list[dict]) -> dict[str, list[str]]:
+    """Category -> sorted sources, from chunk metadata."""
+    docs_by_category: dict[str, set[str]] = {}
+    for meta in metadatas:
+        category = meta.get("category", "General")
+        source = meta.get("source", "unknown")
+        docs_by_category.setdefault(category, set()).add(source)
+    return {category: sorted(sources) for category, sources in sorted(docs_by_category.items())}
+
+
+def save_catalog(collection_name: str, catalog: dict[str, list[str]]) -> None:
+    _write(f"catalog-{collection_name}", json.dumps(catalog, indent=2))
+
+
+def load_catalog(collection_name: str) -> dict[str, list[str]] | None:
+    text = _read(f"catalog-{collection_name}")
+    return json.loads(text) if text is not None else None
+
+
+class HubChain:
+    """The pulled Hub chain, served from memory and refreshed in the background.
+
+    ``load()`` restores the last snapshot so boot doesn't wait on the Hub.
+    ``get()`` returns immediately; once the chain is older than
+    *refresh_seconds*, a background thread pulls it again and rewrites the
+    snapshot. With ``refresh_seconds=0`` every ``get()`` pulls, as before.
+    *prepare* runs once per pulled chain (e.g. to move it onto the shared
+    connection pools).
+    """
+
+    def __init__(
+        self,
+        prompt_ref: str,
+        pull: Callable[[], Any],
+        prepare: Callable[[Any], Any] = lambda chain: chain,
+        refresh_seconds: float = PROMPT_REFRESH_SECONDS,
+    ) -> None:
+        self.prompt_ref = prompt_ref
+        self._pull = pull
+        self._prepare = prepare
+        self.refresh_seconds = refresh_seconds
+        self.chain: Any | None = None
+        self._snapshot: str | None = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def load(self) -> str:
+        """Restore from the snapshot, or pull if there is none; returns which."""
+        text = _read(f"prompt-{self.prompt_ref}")
+        raw = _load_chain(self.prompt_ref, text) if text is not None else None
+        if raw is None:
+            self._refresh()
+            return "hub"
+        with self._lock:
+            self.chain, self._snapshot = self._prepare(raw), text
+            # Snapshots may be old: treat as stale so the first get() refreshes
+            self._loaded_at = 0.0
+        return "snapshot"
+
+    def get(self) -> Any:
+        if self.chain is None or not self.refresh_seconds:
+            return self._refresh()
+        with self._lock:
+            stale = time.monotonic() - self._loaded_at >= self.refresh_seconds
+            if stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._background_refresh, daemon=True).start()
+            return self.chain
+
+    def _refresh(self) -> Any:
+        raw = self._pull()
+        chain = self._prepare(raw)
+        with self._lock:
+            self.chain, self._loaded_at = chain, time.monotonic()
+        try:
+            text = dumps(raw)
+            if text != self._snapshot:
+                _write(f"prompt-{self.prompt_ref}", text)
+                self._snapshot = text
+        except Exception as e:
+            logger.warning(f"Could not snapshot prompt {self.prompt_ref}: {e}")
+        return chain
+
+    def _background_refresh(self) -> None:
+        try:
+            self._refresh()
+        except Exception as e:
+            # Keep serving the chain we have; retry on a later get()
+            logger.warning(f"Could not refresh {self.prompt_ref} from the Hub: {e}")
+            with self._lock:
+                self._loaded_at = time.monotonic()
+        finally:
+            self._refreshing = False
@@ -0,0 +1,171 @@
+"""Cheap-model-first generation cascade.
+
+A fast model answers first. Its answer is only escalated to the strong model
+when a local signal says it is likely to be wrong or incomplete:
+
+- retrieval: the best chunk scores below ``min_top_score``, or the context
+  spans more than ``max_sources`` documents
+- answer: the "I don't have documentation" fallback; a quantity (e.g.
+  "500 requests per minute") whose value appears nowhere in the retrieved
+  context; or the same quantity given different values for the same subject
+
+Retrieval signals are checked before any generation, so those questions go
+straight to the strong model. The fast answer is buffered so it can be
+checked before anything is sent: when it is accepted, it reaches the client
+as a single chunk, so time to first token equals its full generation time.
+Escalated answers stream as usual.
+
+Policies are configured per prompt tag via the ``CASCADE_POLICIES`` JSON env
+var, e.g. ``{"prod": {"enabled": true, "strong_model": "gpt-4o"}}``. It is
+parsed and validated once, at import, so a malformed value fails startup
+instead of every request.
+"""
+
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+from langchain_core.documents import Document
+from pydantic import BaseModel, ValidationError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.config import CASCADE_POLICIES, PROMPT_TAG
+
+FALLBACK_PHRASE = "i don't have documentation"
+
+_UNITS = (
+    r"%|percent|ms|milliseconds?|s|secs?|seconds?|mins?|minutes?|h|hrs?|hours?|days?|weeks?|months?|years?"
+    r"|requests?|req|calls?|rps|qps|retries|attempts?|connections?|transactions?|tokens?"
+    r"|[kmgt]i?b|bytes?|usd|dollars?|eur"
+)
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_QUANTITY = re.compile(rf"(\$)?({_NUMBER})\s*({_UNITS})?(?![\w.])", re.IGNORECASE)
+_ANY_NUMBER = re.compile(_NUMBER)
+# Clause boundaries: punctuation (but not the comma in "1,000"), or a conjunction joining two statements
+_CLAUSE_SPLIT = re.compile(
+    r"[;()\n]|(?<!\d),|,(?!\d)|\.\s|\.$|\b(?:and|but|while|whereas|although|however|then)\b", re.IGNORECASE
+)
+_FILENAME = re.compile(r"\S+\.(?:md|txt|json|ya?ml)\b", re.IGNORECASE)
+_WORD = re.compile(r"[a-z]{3,}")
+_STOPWORDS = frozenset(
+    "the and for are was were has have had its this that these those with from into per each any all"
+    " can may will would should could must not than then also only about after before over under"
+    " says said states stated according document documents source sources both".split()
+)
+_UNIT_WORDS = re.compile(rf"^(?:{_UNITS})$", re.IGNORECASE)
+
+
+class CascadePolicy(BaseModel):
+    """Cascade settings for one prompt tag."""
+
+    enabled: bool = False
+    fast_model: str = "gpt-4o-mini"
+    strong_model: str | None = None  # None = the model configured on the Hub prompt
+    min_top_score: float = 0.35
+    max_sources: int = 3
+    escalate_on_fallback: bool = True
+    escalate_on_conflict: bool = True
+    escalate_on_unsupported_number: bool = True
+
+
+def _parse_policies(raw: str) -> dict[str, CascadePolicy]:
+    if not raw:
+        return {}
+    try:
+        return {tag: CascadePolicy.model_validate(policy) for tag, policy in json.loads(raw).items()}
+    except (ValueError, AttributeError, ValidationError) as e:
+        raise ValueError(f"Invalid CASCADE_POLICIES: {e}") from e
+
+
+_POLICIES = _parse_policies(CASCADE_POLICIES)
+
+
+def policy_for(tag: str = PROMPT_TAG) -> CascadePolicy:
+    """Policy for *tag*, falling back to the ``default`` entry, then to disabled."""
+    return _POLICIES.get(tag) or _POLICIES.get("default") or CascadePolicy()
+
+
+def retrieval_signals(docs: list[Document], policy: CascadePolicy) -> list[str]:
+    """Reasons to skip the fast model, judged from the retrieved chunks alone."""
+    reasons = []
+    scores = [doc.metadata["score"] for doc in docs if "score" in doc.metadata]
+    if not docs or (scores and max(scores) < policy.min_top_score):
+        reasons.append("low_retrieval_score")
+    if len({doc.metadata.get("source") for doc in docs}) > policy.max_sources:
+        reasons.append("multi_doc_context")
+    return reasons
+
+
+def _normalize_unit(unit: str) -> str:
+    unit = unit.lower()
+    return unit[:-1] if len(unit) > 3 and unit.endswith("s") else unit
+
+
+def _quantities(text: str) -> list[tuple[int, str, str, frozenset[str]]]:
+    """(clause index, value, unit, subject words) for every number with a unit."""
+    quantities = []
+    for index, clause in enumerate(_CLAUSE_SPLIT.split(_FILENAME.sub(" ", text))):
+        if not clause:
+            continue
+        found = [
+            (value.replace(",", ""), _normalize_unit(unit or "$"))
+            for currency, value, unit in _QUANTITY.findall(clause)
+            if unit or currency
+        ]
+        if not found:
+            continue
+        words = frozenset(
+            w for w in _WORD.findall(_QUANTITY.sub(" ", clause.lower()))
+            if w not in _STOPWORDS and not _UNIT_WORDS.match(w)
+        )
+        quantities.extend((index, value, unit, words) for value, unit in found)
+    return quantities
+
+
+def _conflicting_numbers(answer: str) -> bool:
+    """Same unit, different values, and one clause's subject words contain the other's.
+
+    Values within one clause are never compared: "between 1 and 5 seconds"
+    or a list of tiers is not a conflict.
+    """
+    quantities = _quantities(answer)
+    for i, (clause, value, unit, words) in enumerate(quantities):
+        for other_clause, other_value, other_unit, other_words in quantities[i + 1:]:
+            if clause == other_clause or unit != other_unit or value == other_value:
+                continue
+            smaller, larger = sorted((words, other_words), key=len)
+            if smaller and smaller <= larger:
+                return True
+    return False
+
+
+def _unsupported_numbers(answer: str, context: str) -> bool:
+    """A quantity in the answer whose value appears nowhere in the context."""
+    known = {n.replace(",", "") for n in _ANY_NUMBER.findall(_FILENAME.sub(" ", context))}
+    return any(value not in known for _, value, _, _ in _quantities(answer))
+
+
+def answer_signals(answer: str, policy: CascadePolicy, context: str | None = None) -> list[str]:
+    """Reasons to escalate a fast-model answer; *context* enables the unsupported-number check."""
+    reasons = []
+    if policy.escalate_on_fallback and FALLBACK_PHRASE in answer.lower().replace("’", "'"):
+        reasons.append("fallback_answer")
+    if policy.escalate_on_conflict and _conflicting_numbers(answer):
+        reasons.append("conflicting_numbers")
+    if policy.escalate_on_unsupported_number and context is not None and _unsupported_numbers(answer, context):
+        reasons.append("unsupported_number")
+    return reasons
+
+
+# Cascade outcomes for /api/metrics
+cascade_stats = {"fast": 0, "escalated": 0, "reasons": Counter()}
+
+
+def record_outcome(reasons: list[str]) -> None:
+    if reasons:
+        cascade_stats["escalated"] += 1
+        cascade_stats["reasons"].update(reasons)
+    else:
+        cascade_stats["fast"] += 1
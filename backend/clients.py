@@ -0,0 +1,179 @@
+"""Shared, long-lived HTTP clients for every OpenAI call.
+
+Building a fresh ``ChatOpenAI`` / ``OpenAIEmbeddings`` per request also builds
+fresh connection pools, so every request pays a new TCP + TLS handshake to the
+upstream. Everything here is created once per process and reused by the
+router, generator, embeddings, ingestion and eval code.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+from functools import lru_cache
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.config import (
+    EMBEDDING_MODEL,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_TIMEOUT,
+    LLM_MODEL,
+)
+
+# HTTP/2 needs the optional `h2` package (`httpx[http2]`)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_CLIENT_FIELDS = {"client", "async_client", "root_client", "root_async_client", "http_client", "http_async_client"}
+
+
+class _ConnectionStats:
+    """Counts requests vs. newly opened connections to derive a reuse rate."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            requests, new = self.requests, self.new_connections
+        reuse_rate = 1 - new / requests if requests else None
+        return {"requests": requests, "new_connections": new, "reuse_rate": reuse_rate}
+
+
+_sync_stats = _ConnectionStats()
+_async_stats = _ConnectionStats()
+
+
+def _is_connect(event: str) -> bool:
+    return event.endswith("connect_tcp.started")
+
+
+def _sync_trace(event: str, info: dict) -> None:
+    if _is_connect(event):
+        _sync_stats.record_connection()
+
+
+async def _async_trace(event: str, info: dict) -> None:
+    if _is_connect(event):
+        _async_stats.record_connection()
+
+
+def _on_sync_request(request: httpx.Request) -> None:
+    _sync_stats.record_request()
+    request.extensions["trace"] = _sync_trace
+
+
+async def _on_async_request(request: httpx.Request) -> None:
+    _async_stats.record_request()
+    request.extensions["trace"] = _async_trace
+
+
+def _client_kwargs() -> dict:
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=10.0),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Process-wide sync HTTP client with keep-alive pooling."""
+    return httpx.Client(event_hooks={"request": [_on_sync_request]}, **_client_kwargs())
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Process-wide async HTTP client with keep-alive pooling."""
+    return httpx.AsyncClient(event_hooks={"request": [_on_async_request]}, **_client_kwargs())
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model: str = LLM_MODEL, temperature: float = 0) -> ChatOpenAI:
+    """Shared chat model bound to the pooled HTTP clients."""
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_embeddings(model: str = EMBEDDING_MODEL) -> OpenAIEmbeddings:
+    """Shared embeddings client bound to the pooled HTTP clients."""
+    return OpenAIEmbeddings(
+        model=model,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+
+def with_pooled_clients(model: BaseChatModel) -> BaseChatModel:
+    """Rebuild a ChatOpenAI (e.g. one pulled from the Hub) on the shared pools.
+
+    Other model types are returned unchanged.
+    """
+    if not isinstance(model, ChatOpenAI) or model.http_async_client is get_async_http_client():
+        return model
+    params = model.model_dump(exclude=_CLIENT_FIELDS)
+    return type(model)(
+        **params,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+
+def _pool_usage(client: httpx.Client | httpx.AsyncClient) -> dict:
+    # httpx doesn't expose pool state publicly; read it off the httpcore pool
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    active = sum(1 for conn in connections if not conn.is_idle())
+    return {
+        "open": len(connections),
+        "active": active,
+        "idle": len(connections) - active,
+        "max": HTTP_MAX_CONNECTIONS,
+        "utilization": active / HTTP_MAX_CONNECTIONS,
+    }
+
+
+def pool_stats() -> dict:
+    """Pool utilization and connection reuse for the shared clients."""
+    stats = {"http2": HTTP2_AVAILABLE}
+    if get_http_client.cache_info().currsize:
+        stats["sync"] = {**_pool_usage(get_http_client()), **_sync_stats.snapshot()}
+    if get_async_http_client.cache_info().currsize:
+        stats["async"] = {**_pool_usage(get_async_http_client()), **_async_stats.snapshot()}
+    return stats
+
+
+async def aclose_clients() -> None:
+    """Close the shared pools (on app shutdown)."""
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+    get_chat_model.cache_clear()
+    get_embeddings.cache_clear()
+    get_http_client.cache_clear()
+    get_async_http_client.cache_clear()
@@ -0,0 +1,168 @@
+"""Blue/green versioned Chroma collections behind an alias pointer.
+
+Ingestion builds each run into a fresh ``{alias}_v{n}`` collection, validates
+it, and only then flips the alias. The pointer is a small JSON file next to
+the Chroma data, replaced atomically with ``os.replace``. Readers resolve the
+alias instead of using ``COLLECTION_NAME`` directly, so a running server
+never sees a half-built collection. Superseded versions are kept for a
+retention window and then garbage-collected.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.config import CHROMA_PERSIST_DIR, COLLECTION_NAME, COLLECTION_RETENTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_CHECK_INTERVAL = 1.0  # seconds between alias pointer checks
+
+T = TypeVar("T")
+
+
+def _pointer_path(alias: str) -> str:
+    return os.path.join(os.path.abspath(CHROMA_PERSIST_DIR), f"{alias}.alias.json")
+
+
+def _read_pointer(alias: str) -> dict:
+    try:
+        with open(_pointer_path(alias)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def resolve_collection(alias: str = COLLECTION_NAME) -> str:
+    """Name of the live collection for *alias*.
+
+    Falls back to the alias itself, which is where pre-versioning ingests
+    wrote their data.
+    """
+    return _read_pointer(alias).get("current") or alias
+
+
+def next_version_name(existing: list[str], alias: str = COLLECTION_NAME) -> str:
+    """Next ``{alias}_v{n}`` name after the highest version in *existing*."""
+    pattern = re.compile(rf"^{re.escape(alias)}_v(\d+)$")
+    versions = [int(m.group(1)) for name in existing if (m := pattern.match(name))]
+    return f"{alias}_v{max(versions, default=0) + 1}"
+
+
+def publish(name: str, alias: str = COLLECTION_NAME) -> str | None:
+    """Atomically point *alias* at collection *name*.
+
+    Returns the previously live collection, which is recorded as retired so
+    :func:`collect_garbage` can drop it once the retention window passes.
+    """
+    pointer = _read_pointer(alias)
+    previous = pointer.get("current")
+    if previous is None and alias != name:
+        previous = alias  # legacy unversioned collection, if any
+    retired = pointer.get("retired", {})
+    retired.pop(name, None)
+    if previous and previous != name:
+        retired[previous] = time.time()
+
+    path = _pointer_path(alias)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"current": name, "published_at": time.time(), "retired": retired}, f, indent=2)
+    os.replace(tmp_path, path)
+    return previous
+
+
+def collect_garbage(
+    client,
+    alias: str = COLLECTION_NAME,
+    retention_seconds: float = COLLECTION_RETENTION_SECONDS,
+) -> list[str]:
+    """Delete retired versions older than *retention_seconds*; returns their names."""
+    pointer = _read_pointer(alias)
+    retired = pointer.get("retired", {})
+    existing = set(client.list_collections())
+    now = time.time()
+
+    deleted = []
+    for name, retired_at in list(retired.items()):
+        if name == pointer.get("current") or now - retired_at < retention_seconds:
+            continue
+        if name in existing:
+            client.delete_collection(name)
+        deleted.append(name)
+        del retired[name]
+
+    if deleted:
+        # Re-read so a publish that raced with us isn't overwritten
+        latest = _read_pointer(alias)
+        latest["retired"] = {k: v for k, v in latest.get("retired", {}).items() if k not in deleted}
+        path = _pointer_path(alias)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(latest, f, indent=2)
+        os.replace(tmp_path, path)
+    return deleted
+
+
+class LiveCollection(Generic[T]):
+    """Holds an opened handle for the live version of an alias.
+
+    ``get()`` re-checks the pointer at most once a second. When it moves,
+    the new version is opened and warmed by *warm* on a background thread,
+    and only then swapped in. Requests keep using the old version meanwhile.
+    """
+
+    def __init__(
+        self,
+        open_fn: Callable[[str], T],
+        warm: Callable[[T], None] | None = None,
+        alias: str = COLLECTION_NAME,
+    ) -> None:
+        self._open = open_fn
+        self._warm = warm
+        self.alias = alias
+        self.name: str | None = None
+        self.handle: T | None = None
+        self._checked_at = 0.0
+        self._switching = False
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        with self._lock:
+            if self.handle is None:
+                self.name = resolve_collection(self.alias)
+                self.handle = self._open(self.name)
+                self._checked_at = time.monotonic()
+                return self.handle
+
+            now = time.monotonic()
+            if now - self._checked_at >= _CHECK_INTERVAL and not self._switching:
+                self._checked_at = now
+                name = resolve_collection(self.alias)
+                if name != self.name:
+                    self._switching = True
+                    threading.Thread(target=self._switch, args=(name,), daemon=True).start()
+            return self.handle
+
+    def _switch(self, name: str) -> None:
+        try:
+            start = time.perf_counter()
+            handle = self._open(name)
+            if self._warm is not None:
+                self._warm(handle)
+            with self._lock:
+                previous, self.name, self.handle = self.name, name, handle
+            logger.info(
+                f"Switched '{self.alias}' from {previous} to {name} "
+                f"(warmed in {(time.perf_counter() - start) * 1000:.0f}ms)"
+            )
+        except Exception as e:
+            logger.warning(f"Could not switch '{self.alias}' to {name}: {e}")
+        finally:
+            self._switching = False
@@ -9,16 +9,49 @@ EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 
 # ChromaDB
 CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", os.path.join(os.path.dirname(__file__), "..", "chroma_db"))
-COLLECTION_NAME = "novapay_docs"
+COLLECTION_NAME = "novapay_docs"  # alias; ingests write to versioned {COLLECTION_NAME}_v{n} collections
+COLLECTION_RETENTION_SECONDS = int(os.getenv("COLLECTION_RETENTION_SECONDS", "3600"))  # keep superseded versions this long
 
 # RAG
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 RETRIEVER_K = 4
+LIST_DOCS_PRESENTATION = os.getenv("LIST_DOCS_PRESENTATION", "direct")  # direct | llm (extra LLM call to restate the list)
 
 # Prompt Hub
 PROMPT_NAME = os.getenv("PROMPT_NAME", "novapay-qa-prompt")
 PROMPT_TAG = os.getenv("PROMPT_TAG", "prod")
+PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "hub")  # hub | cache (static prefix first; see backend/prompt_layout.py)
+PINNED_DOCS = [s.strip() for s in os.getenv("PINNED_DOCS", "").split(",") if s.strip()]  # sources kept in the cached prefix
+PROMPT_REFRESH_SECONDS = float(os.getenv("PROMPT_REFRESH_SECONDS", "60"))  # re-pull the Hub prompt in the background; 0 = every request
+
+# Boot snapshots (Hub prompt + document catalog) for fast cold starts
+BOOT_SNAPSHOT_DIR = os.getenv("BOOT_SNAPSHOT_DIR", os.path.join(CHROMA_PERSIST_DIR, "boot"))
+
+# Generation cascade, per prompt tag (JSON; see backend/cascade.py). Empty = disabled.
+CASCADE_POLICIES = os.getenv("CASCADE_POLICIES", "")
 
 # LangSmith
 LANGSMITH_PROJECT = os.getenv("LANGSMITH_PROJECT", "novapay-docs-qa")
+
+# Streaming (SSE)
+STREAM_COALESCE_CHARS = int(os.getenv("STREAM_COALESCE_CHARS", "32"))  # flush after N buffered chars
+STREAM_COALESCE_MS = int(os.getenv("STREAM_COALESCE_MS", "30"))  # ...or after T ms; 0 disables coalescing
+
+# Shared HTTP clients (OpenAI)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))  # seconds an idle connection stays open
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
+
+# Query embeddings (micro-batching + cache)
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))  # max added delay; 0 disables batching
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "64"))
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+
+# In-process vector index (optional; "chroma" queries Chroma directly)
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "chroma")  # chroma | exact | ivf
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(CHROMA_PERSIST_DIR, "vector_index"))
+VECTOR_INDEX_MMAP_ROWS = int(os.getenv("VECTOR_INDEX_MMAP_ROWS", "200000"))  # larger snapshots stay memory-mapped
+IVF_NLIST = int(os.getenv("IVF_NLIST", "0"))  # 0 = sqrt(n)
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
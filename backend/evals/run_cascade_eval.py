@@ -0,0 +1,144 @@
+"""Offline evaluation of the generation cascade against golden_dataset.json.
+
+Answers every golden example with the strong model alone and with the
+cascade (fast model first, escalated on local signals), judges both against
+the reference answer with the correctness judge prompt, and reports quality,
+latency and cost side by side.
+
+Usage:
+    cd backend && uv run python -m evals.run_cascade_eval                       # policy for PROMPT_TAG
+    cd backend && uv run python -m evals.run_cascade_eval --tag staging         # policy + prompt for another tag
+    cd backend && uv run python -m evals.run_cascade_eval --fast gpt-4o-mini --strong gpt-4o
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+
+from langchain_core.documents import Document
+from langsmith import Client
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from cascade import answer_signals, policy_for, retrieval_signals
+from clients import get_chat_model
+from config import LLM_MODEL, PROMPT_NAME, PROMPT_TAG
+from evals.is_correct_eval_prompt import IS_CORRECT_JUDGE_PROMPT
+
+GOLDEN_DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "seed", "golden_dataset.json")
+
+# USD per 1M (input, output) tokens; list prices, update as they change
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+def _docs_from_context(context: str) -> list[Document]:
+    """Rebuild source-only Documents from the stored ``[Document i: source]`` headers."""
+    return [Document(page_content="", metadata={"source": s}) for s in re.findall(r"\[Document \d+: ([^\]]+)\]", context)]
+
+
+def _cost(model: str, usage: dict) -> float:
+    price_in, price_out = PRICES.get(model, (0.0, 0.0))
+    return (usage.get("input_tokens", 0) * price_in + usage.get("output_tokens", 0) * price_out) / 1_000_000
+
+
+async def _generate(prompt, model: str, inputs: dict) -> tuple[str, float, float]:
+    """Answer, latency in seconds, cost in USD."""
+    start = time.perf_counter()
+    message = await (prompt | get_chat_model(model)).ainvoke(inputs)
+    return message.content, time.perf_counter() - start, _cost(model, message.usage_metadata or {})
+
+
+async def _judge(model: str, question: str, reference: str, answer: str) -> float:
+    prompt = (
+        IS_CORRECT_JUDGE_PROMPT.replace("{{input.question}}", question)
+        .replace("{{referenceOutput.answer}}", reference)
+        .replace("{{output.output.content}}", answer)
+    )
+    response = await get_chat_model(model).ainvoke(prompt)
+    match = re.search(r"Score:\s*([\d.]+)", response.content)
+    return float(match.group(1)) if match else 0.0
+
+
+async def _evaluate(example: dict, prompt, args, policy, limit: asyncio.Semaphore) -> dict:
+    question = example["inputs"]["question"]
+    inputs = {"question": question, "context": example["inputs"]["context"], "history": []}
+    reference = example["outputs"]["answer"]
+
+    async with limit:
+        strong_answer, strong_latency, strong_cost = await _generate(prompt, args.strong, inputs)
+
+        # Retrieval scores aren't stored in the golden set; only the multi-doc signal applies
+        reasons = retrieval_signals(_docs_from_context(inputs["context"]), policy)
+        reasons = [r for r in reasons if r != "low_retrieval_score"]
+        latency, cost = 0.0, 0.0
+        if not reasons:
+            answer, latency, cost = await _generate(prompt, args.fast, inputs)
+            reasons = answer_signals(answer, policy, inputs["context"])
+        if reasons:
+            answer, escalated_latency, escalated_cost = await _generate(prompt, args.strong, inputs)
+            latency, cost = latency + escalated_latency, cost + escalated_cost
+
+        strong_score, cascade_score = await asyncio.gather(
+            _judge(args.judge, question, reference, strong_answer),
+            _judge(args.judge, question, reference, answer),
+        )
+
+    print(f"  {'escalated' if reasons else 'fast':<9} {cascade_score:.2f} vs {strong_score:.2f}  {question}")
+    return {
+        "reasons": reasons,
+        "strong": {"score": strong_score, "latency": strong_latency, "cost": strong_cost},
+        "cascade": {"score": cascade_score, "latency": latency, "cost": cost},
+    }
+
+
+def _report(results: list[dict]) -> None:
+    print(f"\n{'':<10} {'correctness':>11} {'p50 latency':>12} {'total cost':>11}")
+    for mode in ("strong", "cascade"):
+        rows = [r[mode] for r in results]
+        print(
+            f"{mode:<10} {statistics.mean(r['score'] for r in rows):>11.3f} "
+            f"{statistics.median(r['latency'] for r in rows):>11.2f}s "
+            f"{sum(r['cost'] for r in rows):>10.4f}$"
+        )
+    escalated = [r for r in results if r["reasons"]]
+    reasons = Counter(reason for r in escalated for reason in r["reasons"])
+    print(f"\nEscalated {len(escalated)}/{len(results)}: {dict(reasons)}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline cascade eval against the golden dataset")
+    parser.add_argument("--tag", default=PROMPT_TAG, help=f"Prompt tag and cascade policy (default: {PROMPT_TAG})")
+    parser.add_argument("--fast", help="Fast model (default: from the tag's policy)")
+    parser.add_argument("--strong", help="Strong model (default: from the tag's policy, else LLM_MODEL)")
+    parser.add_argument("--judge", default="gpt-4o", help="Judge model (default: gpt-4o)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Examples in flight (default: 4)")
+    args = parser.parse_args()
+
+    policy = policy_for(args.tag)
+    args.fast = args.fast or policy.fast_model
+    args.strong = args.strong or policy.strong_model or LLM_MODEL
+
+    with open(GOLDEN_DATASET_PATH) as f:
+        examples = json.load(f)
+
+    prompt = Client().pull_prompt(f"{PROMPT_NAME}:{args.tag}")
+    print(f"Prompt: {PROMPT_NAME}:{args.tag}  fast={args.fast}  strong={args.strong}  judge={args.judge}")
+    print(f"Policy: {policy.model_dump()}\n")
+
+    limit = asyncio.Semaphore(args.concurrency)
+    results = await asyncio.gather(*(_evaluate(ex, prompt, args, policy, limit) for ex in examples))
+    _report(results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
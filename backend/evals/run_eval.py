@@ -15,6 +15,7 @@ from langsmith import Client, evaluate
 from pydantic import BaseModel, Field
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from clients import with_pooled_clients
 from config import PROMPT_NAME, PROMPT_TAG
 
 DATASET_NAME = "novapay-qa-golden"
@@ -27,13 +28,14 @@ class AnswerOutput(BaseModel):
 
 def make_target(prompt_ref: str):
     """Return a target function closed over the prompt ref."""
-    def target(inputs: dict) -> dict:
-        client = Client()
-        chain = client.pull_prompt(prompt_ref, include_model=True)
-        structured_chain = chain.first | chain.last.with_structured_output(
-            AnswerOutput, method="json_schema", strict=True
-        )
+    # Pull once and share the pooled model across all examples
+    client = Client()
+    chain = client.pull_prompt(prompt_ref, include_model=True)
+    structured_chain = chain.first | with_pooled_clients(chain.last).with_structured_output(
+        AnswerOutput, method="json_schema", strict=True
+    )
 
+    def target(inputs: dict) -> dict:
         response = structured_chain.invoke({
             "question": inputs["question"],
             "context": inputs["context"],
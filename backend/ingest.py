@@ -4,14 +4,25 @@ import os
 import re
 import sys
 
+import chromadb
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 
 # Allow running as `python -m backend.ingest` or `python backend/ingest.py`
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from backend.config import CHROMA_PERSIST_DIR, COLLECTION_NAME, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL
+from backend.boot_snapshot import catalog_from_metadatas, save_catalog
+from backend.clients import get_embeddings
+from backend.collection_alias import collect_garbage, next_version_name, publish
+from backend.config import (
+    CHROMA_PERSIST_DIR,
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    COLLECTION_NAME,
+    COLLECTION_RETENTION_SECONDS,
+    EMBEDDING_MODEL,
+)
+from backend.vector_index import write_snapshot
 
 
 def extract_title(content: str, filename: str) -> str:
@@ -57,48 +68,68 @@ def ingest_docs():
         chunk_size=CHUNK_SIZE,
         chunk_overlap=CHUNK_OVERLAP,
         separators=["\n## ", "\n### ", "\n\n", "\n", " ", ""],
+        add_start_index=True,  # stable chunk order for cache-friendly prompts
     )
     chunks = text_splitter.split_documents(documents)
     print(f"Split into {len(chunks)} chunks")
 
     # Create embeddings and store in ChromaDB
     print(f"Creating embeddings with {EMBEDDING_MODEL}...")
-    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
+    embeddings = get_embeddings()
 
     persist_dir = os.path.abspath(CHROMA_PERSIST_DIR)
     print(f"Storing in ChromaDB at {persist_dir}...")
 
-    # Clear existing collection if it exists
-    if os.path.exists(persist_dir):
-        try:
-            import chromadb
-            client = chromadb.PersistentClient(path=persist_dir)
-            try:
-                client.delete_collection(COLLECTION_NAME)
-            except ValueError:
-                pass
-            print("Cleared existing ChromaDB collection")
-        except Exception:
-            import shutil
-            shutil.rmtree(persist_dir, ignore_errors=True)
-            print("Cleared existing ChromaDB data")
-
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        collection_name=COLLECTION_NAME,
-        persist_directory=persist_dir,
-    )
+    # Build into a fresh versioned collection; the live version keeps serving meanwhile
+    client = chromadb.PersistentClient(path=persist_dir)
+    version_name = next_version_name(client.list_collections())
+    print(f"Building collection '{version_name}'...")
+
+    # Any failure before publishing drops the half-built version, which is
+    # never recorded as retired and so would never be garbage-collected
+    try:
+        vectorstore = Chroma.from_documents(
+            documents=chunks,
+            embedding=embeddings,
+            collection_name=version_name,
+            persist_directory=persist_dir,
+        )
+
+        # Validate before anything points at it
+        count = vectorstore._collection.count()
+        sample = vectorstore._collection.peek(1)
+        hits = (
+            vectorstore.similarity_search_by_vector(list(sample["embeddings"][0]), k=1)
+            if len(sample["embeddings"])
+            else []
+        )
+        if count != len(chunks) or not hits:
+            raise ValueError(f"validation failed ({count}/{len(chunks)} vectors)")
+    except Exception as e:
+        if version_name in client.list_collections():
+            client.delete_collection(version_name)
+        print(f"Error: could not build '{version_name}': {e}; live collection unchanged")
+        sys.exit(1)
+
+    # Publish an in-process index snapshot and the list_documents catalog;
+    # running servers reload them automatically
+    snapshot = write_snapshot(vectorstore._collection)
+    save_catalog(version_name, catalog_from_metadatas([chunk.metadata for chunk in chunks]))
+
+    # Flip the alias; running servers warm the new version and switch over
+    previous = publish(version_name)
 
     print(f"\nIngestion complete!")
     print(f"  Documents: {len(documents)}")
     print(f"  Chunks:    {len(chunks)}")
     print(f"  Stored in: {persist_dir}")
+    print(f"  Verified:  {count} vectors in collection '{version_name}'")
+    print(f"  Snapshot:  {snapshot}")
+    print(f"  Live:      '{COLLECTION_NAME}' -> '{version_name}' (was '{previous}')")
 
-    # Verify
-    count = vectorstore._collection.count()
-    print(f"  Verified:  {count} vectors in collection '{COLLECTION_NAME}'")
-
+    deleted = collect_garbage(client)
+    if deleted:
+        print(f"  Removed:   {', '.join(deleted)} (retired > {COLLECTION_RETENTION_SECONDS}s ago)")
 
 if __name__ == "__main__":
     ingest_docs()
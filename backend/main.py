@@ -1,9 +1,10 @@
 """FastAPI application for NovaPay Docs Q&A."""
 
-import json
+import asyncio
 import logging
 import os
 import sys
+import time
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,7 +13,12 @@ from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from backend.rag_chain import stream_rag_response
+from backend.cascade import cascade_stats
+from backend.clients import aclose_clients, pool_stats
+from backend.prompt_layout import cache_stats
+from backend.query_embeddings import get_query_embedder
+from backend.rag_chain import index_manager, get_catalog, restore_chain, stream_rag_response, stream_stats
+from backend.streaming import STREAM_FORMATS, coalesce_tokens, dumps, encode_event
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,6 +44,7 @@ app.add_middleware(
 class ChatRequest(BaseModel):
     question: str
     metadata: dict | None = None
+    stream_format: str = "json"
 
 
 @app.get("/api/health")
@@ -45,32 +52,52 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/api/metrics")
+async def metrics():
+    return {
+        "http_pools": pool_stats(),
+        "query_embeddings": get_query_embedder().stats,
+        "streams": stream_stats,
+        "cascade": cascade_stats,
+        "prompt_cache": cache_stats(),
+    }
+
+
 @app.post("/api/chat/stream")
 async def chat_stream(request: ChatRequest):
     """Streaming chat endpoint. Returns SSE stream."""
     if not request.question.strip():
         raise HTTPException(status_code=400, detail="Question cannot be empty")
+    if request.stream_format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported stream_format: {request.stream_format}")
 
     thread_id = (request.metadata or {}).get("thread_id")
 
     async def event_generator():
         try:
             with tracing_context(metadata={"session_id": thread_id}):
-                async for chunk in stream_rag_response(
-                    question=request.question,
-                    metadata=request.metadata,
+                async for chunk in coalesce_tokens(
+                    stream_rag_response(
+                        question=request.question,
+                        metadata=request.metadata,
+                    )
                 ):
-                    yield {"data": json.dumps(chunk)}
+                    yield encode_event(chunk, request.stream_format)
+        except asyncio.CancelledError:
+            # Client disconnected: sse-starlette cancels us, and the
+            # cancellation reaches the in-flight upstream calls
+            logger.info(f"Client disconnected, stream cancelled (thread {thread_id})")
+            raise
         except FileNotFoundError as e:
             yield {
-                "data": json.dumps(
+                "data": dumps(
                     {"type": "error", "content": str(e)}
                 )
             }
         except Exception as e:
             logger.error(f"Streaming error: {e}")
             yield {
-                "data": json.dumps(
+                "data": dumps(
                     {"type": "error", "content": "Internal server error"}
                 )
             }
@@ -93,15 +120,68 @@ async def startup():
     logger.info("Health check: http://localhost:8000/api/health")
     logger.info("=" * 50)
 
-    # Check ChromaDB
+    # Independent boot steps run in parallel; each logs its own failure
+    # rather than blocking the others
+    start = time.perf_counter()
+    timings = await asyncio.gather(
+        _timed("chain", _boot_chain),
+        _timed("vectors", _boot_vectors),
+        _timed("catalog", _boot_catalog),
+    )
+    logger.info(
+        f"Boot complete in {(time.perf_counter() - start) * 1000:.0f}ms "
+        f"({', '.join(f'{name} {ms:.0f}ms' for name, ms in timings)})"
+    )
+
+
+async def _timed(name: str, step) -> tuple[str, float]:
+    start = time.perf_counter()
+    await asyncio.to_thread(step)
+    return name, (time.perf_counter() - start) * 1000
+
+
+def _boot_chain() -> None:
     try:
-        from backend.rag_chain import _get_vectorstore
+        source = restore_chain()
+        logger.info(f"Prompt chain restored from {source}")
+    except Exception as e:
+        logger.warning(f"Could not load the prompt chain; retrying on first request: {e}")
+
+
+def _boot_vectors() -> None:
+    # Load the in-process vector index (VECTOR_INDEX=exact|ivf)
+    manager = index_manager()
+    if manager is not None:
+        if manager.load() is not None:
+            return
+        logger.warning(
+            "No vector index snapshot found; falling back to Chroma. "
+            "Run `python -m backend.ingest` to build one."
+        )
+
+    # Check ChromaDB, and warm it so the first query doesn't load the segment
+    try:
+        from backend.rag_chain import _get_vectorstore, _warm_vectorstore
         vs = _get_vectorstore()
         count = vs._collection.count()
-        logger.info(f"ChromaDB loaded: {count} vectors in collection")
+        _warm_vectorstore(vs)
+        logger.info(f"ChromaDB loaded: {count} vectors in collection '{vs._collection.name}'")
     except FileNotFoundError:
         logger.warning(
             "ChromaDB not found. Run `python -m backend.ingest` to ingest documents."
         )
     except Exception as e:
         logger.warning(f"Could not connect to ChromaDB: {e}")
+
+
+def _boot_catalog() -> None:
+    try:
+        catalog = get_catalog()
+        logger.info(f"Catalog loaded: {sum(len(s) for s in catalog.values())} documents")
+    except Exception as e:
+        logger.warning(f"Could not load the document catalog: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await aclose_clients()
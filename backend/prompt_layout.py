@@ -0,0 +1,130 @@
+"""Cache-friendly prompt assembly.
+
+OpenAI reuses work for the longest prompt prefix it has seen recently
+(from 1024 tokens, in 128-token steps). The Hub prompt puts the retrieved
+context inside the system message, ahead of history, so every new retrieval
+changes the very first message and no two requests share a prefix.
+
+The ``cache`` layout (``PROMPT_LAYOUT=cache``) reorders the same prompt:
+
+1. a static system message: the Hub rules, plus the pinned documents
+   (``PINNED_DOCS``) in a fixed order
+2. the conversation history
+3. one human message with the retrieved context and the question
+
+Follow-up turns in a session then share everything up to the latest turn,
+and with pinned documents the prefix is shared across sessions too.
+Retrieved chunks are sorted by source and position so the same retrieval
+always renders to the same text.
+"""
+
+import logging
+import os
+import sys
+from typing import Any, Callable
+
+from langchain_core.documents import Document
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, SystemMessagePromptTemplate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.config import PINNED_DOCS
+
+logger = logging.getLogger(__name__)
+
+_CONTEXT_SENTINEL = "\x00context\x00"
+QUESTION_TEMPLATE = "Context:\n{context}\n\nQuestion: {question}"
+
+# Prompt-cache hits for /api/metrics, from the usage metadata of each generation
+prompt_cache_stats = {"generations": 0, "input_tokens": 0, "cached_tokens": 0}
+
+
+def record_usage(usage: dict | None) -> None:
+    """Count input and cache-read tokens from a message's ``usage_metadata``."""
+    if not usage:
+        return
+    prompt_cache_stats["generations"] += 1
+    prompt_cache_stats["input_tokens"] += usage.get("input_tokens", 0)
+    prompt_cache_stats["cached_tokens"] += (usage.get("input_token_details") or {}).get("cache_read", 0)
+
+
+def cache_stats() -> dict:
+    input_tokens = prompt_cache_stats["input_tokens"]
+    ratio = prompt_cache_stats["cached_tokens"] / input_tokens if input_tokens else 0.0
+    return {**prompt_cache_stats, "cached_ratio": round(ratio, 4)}
+
+
+def _chunk_order(doc: Document) -> tuple:
+    return (doc.metadata.get("source", ""), doc.metadata.get("start_index", 0), doc.page_content)
+
+
+def order_for_cache(docs: list[Document], pinned_sources: frozenset[str] = frozenset()) -> list[Document]:
+    """Retrieved chunks in a deterministic order, minus those already pinned in the prefix."""
+    return sorted((d for d in docs if d.metadata.get("source") not in pinned_sources), key=_chunk_order)
+
+
+_pinned_cache: dict[tuple, tuple[str, frozenset[str]]] = {}
+
+
+def pinned_context(get_collection: Callable[[], Any], sources: list[str] | None = None) -> tuple[str, frozenset[str]]:
+    """Full text of the pinned documents, and the sources found.
+
+    *sources* defaults to ``PINNED_DOCS``. *get_collection* is only called
+    when there is something to pin, so without pinned documents the Chroma
+    collection is never opened. Cached per collection name, so a blue/green
+    switch picks up the new version.
+    """
+    sources = PINNED_DOCS if sources is None else sources
+    if not sources:
+        return "", frozenset()
+    collection = get_collection()
+    key = (collection.name, tuple(sources))
+    if key not in _pinned_cache:
+        result = collection.get(where={"source": {"$in": list(sources)}}, include=["documents", "metadatas"])
+        chunks = sorted(
+            (Document(page_content=text, metadata=meta) for text, meta in zip(result["documents"], result["metadatas"])),
+            key=_chunk_order,
+        )
+        found = frozenset(chunk.metadata["source"] for chunk in chunks)
+        missing = set(sources) - found
+        if missing:
+            logger.warning(f"Pinned documents not in '{collection.name}': {', '.join(sorted(missing))}")
+        by_source: dict[str, list[str]] = {}
+        for chunk in chunks:
+            by_source.setdefault(chunk.metadata["source"], []).append(chunk.page_content)
+        text = "\n\n---\n\n".join(f"[Pinned: {source}]\n" + "\n".join(parts) for source, parts in by_source.items())
+        _pinned_cache[key] = (text, found)
+    return _pinned_cache[key]
+
+
+def cache_friendly_prompt(hub_prompt: ChatPromptTemplate, pinned: str = "") -> ChatPromptTemplate:
+    """Rebuild *hub_prompt* with the static rules first and the context last.
+
+    Expects the Hub layout (system message with ``{context}``, optional
+    ``history`` placeholder, human ``{question}``); anything else is returned
+    unchanged.
+    """
+    system = next(
+        (
+            m for m in hub_prompt.messages
+            if isinstance(m, SystemMessagePromptTemplate) and m.prompt.input_variables == ["context"]
+        ),
+        None,
+    )
+    if system is None:
+        logger.warning("Hub prompt has no system message with {context}; keeping its layout")
+        return hub_prompt
+
+    rules, _, tail = system.prompt.format(context=_CONTEXT_SENTINEL).partition(_CONTEXT_SENTINEL)
+    rules = rules.rstrip().removesuffix("Context:").rstrip()
+    static = rules + tail.rstrip()
+    if pinned:
+        static += f"\n\nReference documents (always available):\n\n{pinned}"
+    static += "\n\nThe context for each question is given in the user's latest message, before the question."
+
+    # A literal SystemMessage, so braces in the rules or pinned docs aren't template variables
+    return ChatPromptTemplate.from_messages([
+        SystemMessage(content=static),
+        MessagesPlaceholder("history", optional=True),
+        ("human", QUESTION_TEMPLATE),
+    ])
@@ -0,0 +1,137 @@
+"""Query-embedding service: micro-batching plus an in-memory cache.
+
+Every retrieval used to make its own single-text embeddings request. Under
+concurrency that turns into hundreds of tiny upstream calls. This service
+collects the questions that arrive within a short window into one
+embeddings call, shares in-flight results between identical questions, and
+keeps the vectors of recently asked questions in an LRU cache.
+"""
+
+import asyncio
+import os
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.clients import get_embeddings
+from backend.config import EMBED_BATCH_MAX, EMBED_BATCH_WINDOW_MS, EMBED_CACHE_SIZE
+
+
+def normalize_question(text: str) -> str:
+    """Cache key for a question: case-folded with whitespace collapsed."""
+    return " ".join(text.casefold().split())
+
+
+class QueryEmbeddingService(Embeddings):
+    """Embeddings wrapper that batches and caches single-query lookups.
+
+    ``aembed_query`` waits at most *window_ms* (or until *max_batch*
+    questions are queued) before sending the whole batch as one
+    ``aembed_documents`` call. ``embed_documents`` is passed straight
+    through, so the service can be used as a vectorstore's embedding
+    function. A *window_ms* of 0 disables batching but keeps the cache.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        window_ms: float = EMBED_BATCH_WINDOW_MS,
+        max_batch: int = EMBED_BATCH_MAX,
+        cache_size: int = EMBED_CACHE_SIZE,
+    ) -> None:
+        self._embeddings = embeddings
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._pending: dict[str, tuple[str, asyncio.Future]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"queries": 0, "cache_hits": 0, "upstream_requests": 0, "batched_queries": 0}
+
+    def _cache_get(self, key: str) -> list[float] | None:
+        vector = self._cache.get(key)
+        if vector is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+        return vector
+
+    def _cache_put(self, key: str, vector: list[float]) -> None:
+        if self._cache_size <= 0:
+            return
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self._embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        self.stats["queries"] += 1
+        key = normalize_question(text)
+        vector = self._cache_get(key)
+        if vector is None:
+            vector = self._embeddings.embed_documents([text])[0]
+            self.stats["upstream_requests"] += 1
+            self._cache_put(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.stats["queries"] += 1
+        key = normalize_question(text)
+        vector = self._cache_get(key)
+        if vector is not None:
+            return vector
+
+        if key in self._pending:
+            future = self._pending[key][1]
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = (text, future)
+            if self._window <= 0 or len(self._pending) >= self._max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self._window, self._flush)
+
+        # Shield so one cancelled caller doesn't fail everyone sharing the batch
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._embed_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _embed_batch(self, batch: dict[str, tuple[str, asyncio.Future]]) -> None:
+        self.stats["upstream_requests"] += 1
+        self.stats["batched_queries"] += len(batch)
+        try:
+            vectors = await self._embeddings.aembed_documents([text for text, _ in batch.values()])
+        except Exception as e:
+            for _, future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (key, (_, future)), vector in zip(batch.items(), vectors):
+            self._cache_put(key, vector)
+            if not future.done():
+                future.set_result(vector)
+
+
+@lru_cache(maxsize=1)
+def get_query_embedder() -> QueryEmbeddingService:
+    """Process-wide query embedder on top of the shared embeddings client."""
+    return QueryEmbeddingService(get_embeddings())
@@ -1,28 +1,36 @@
 """Core RAG pipeline for NovaPay Docs Q&A."""
 
+import asyncio
 import logging
 import os
 import sys
-from typing import AsyncIterator
+from typing import TYPE_CHECKING, AsyncIterator
 
-from langchain_chroma import Chroma
 from langchain_core.documents import Document
 from langchain_core.chat_history import InMemoryChatMessageHistory
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 import langsmith as ls
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.boot_snapshot import HubChain, catalog_from_metadatas, load_catalog, save_catalog
+from backend.cascade import answer_signals, policy_for, record_outcome, retrieval_signals
+from backend.clients import get_chat_model, with_pooled_clients
+from backend.collection_alias import LiveCollection, resolve_collection
 from backend.config import (
     CHROMA_PERSIST_DIR,
-    COLLECTION_NAME,
-    EMBEDDING_MODEL,
-    LLM_MODEL,
+    LIST_DOCS_PRESENTATION,
+    PROMPT_LAYOUT,
     PROMPT_NAME,
     PROMPT_TAG,
     RETRIEVER_K,
+    VECTOR_INDEX,
 )
+from backend.prompt_layout import cache_friendly_prompt, order_for_cache, pinned_context, record_usage
+from backend.query_embeddings import get_query_embedder
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
 
 logger = logging.getLogger(__name__)
 
@@ -35,23 +43,40 @@ def get_session_history(session_id: str) -> InMemoryChatMessageHistory:
         _history_store[session_id] = InMemoryChatMessageHistory()
     return _history_store[session_id]
 
-def _get_vectorstore() -> Chroma:
-    """Initialize the ChromaDB vector store."""
+def _open_vectorstore(collection_name: str) -> "Chroma":
+    # Deferred: Chroma isn't needed when serving from the in-process index
+    from langchain_chroma import Chroma
+
+    return Chroma(
+        collection_name=collection_name,
+        persist_directory=os.path.abspath(CHROMA_PERSIST_DIR),
+        embedding_function=get_query_embedder(),
+    )
+
+
+def _warm_vectorstore(vectorstore: "Chroma") -> None:
+    """Touch the collection so its HNSW segment is loaded before serving."""
+    sample = vectorstore._collection.peek(1)
+    if len(sample["embeddings"]):
+        vectorstore.similarity_search_by_vector(list(sample["embeddings"][0]), k=1)
+
+
+# Live version of the blue/green collection alias (see collection_alias)
+_live_collection = LiveCollection(_open_vectorstore, warm=_warm_vectorstore)
+
+
+def _get_vectorstore() -> "Chroma":
+    """Return the ChromaDB vector store for the live collection version."""
     persist_dir = os.path.abspath(CHROMA_PERSIST_DIR)
     if not os.path.exists(persist_dir):
         raise FileNotFoundError(
             f"ChromaDB not found at {persist_dir}. "
             "Run `python -m backend.ingest` first to ingest documents."
         )
-    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
-    return Chroma(
-        collection_name=COLLECTION_NAME,
-        persist_directory=persist_dir,
-        embedding_function=embeddings,
-    )
+    return _live_collection.get()
 
 
-def _get_chain():
+def _pull_chain():
     """Pull prompt + model from LangSmith Hub."""
     client = ls.Client()
     prompt_ref = f"{PROMPT_NAME}:{PROMPT_TAG}"
@@ -60,23 +85,69 @@ def _get_chain():
     return chain
 
 
-@tool
-def list_documents() -> str:
-    """List all available documents in the NovaPay knowledge base, organized by category."""
-    vectorstore = _get_vectorstore()
-    collection = vectorstore._collection
-    all_metadata = collection.get()["metadatas"]
+def _prepare_chain(chain):
+    # Swap the Hub-built model onto the shared connection pools; stream usage
+    # so cached-token counts reach the metrics
+    return chain.first | with_pooled_clients(chain.last).bind(stream_usage=True)
+
+
+# Snapshot-backed Hub chain, refreshed in the background (see boot_snapshot)
+_hub_chain = HubChain(f"{PROMPT_NAME}:{PROMPT_TAG}", _pull_chain, prepare=_prepare_chain)
+
+
+def _get_chain():
+    return _hub_chain.get()
+
 
-    docs_by_category: dict[str, set[str]] = {}
-    for meta in all_metadata:
-        category = meta.get("category", "General")
-        source = meta.get("source", "unknown")
-        docs_by_category.setdefault(category, set()).add(source)
+def restore_chain() -> str:
+    """Boot: restore the chain from its local snapshot (or the Hub); returns which."""
+    return _hub_chain.load()
+
+
+# Catalog behind list_documents, per collection version
+_catalogs: dict[str, dict[str, list[str]]] = {}
+
+
+def get_catalog() -> dict[str, list[str]]:
+    """Category -> sources for the live collection, from memory, snapshot, or a Chroma scan."""
+    name = resolve_collection()
+    if name in _catalogs:
+        return _catalogs[name]
+    catalog = load_catalog(name)
+    if catalog is not None:
+        _catalogs[name] = catalog
+        return catalog
+
+    # Key the scan by the collection actually read: while a new version
+    # warms, the live handle can still be the previous one
+    collection = _get_vectorstore()._collection
+    catalog = catalog_from_metadatas(collection.get(include=["metadatas"])["metadatas"])
+    save_catalog(collection.name, catalog)
+    _catalogs[collection.name] = catalog
+    return catalog
+
+
+@tool(parse_docstring=True)
+def list_documents(category: str | None = None) -> str:
+    """List all available documents in the NovaPay knowledge base, organized by category.
+
+    Args:
+        category: Only list this category (e.g. "runbooks", "api"). Omit to list everything.
+    """
+    docs_by_category = get_catalog()
+
+    if category:
+        wanted = category.strip().lower()
+        matches = {c: d for c, d in docs_by_category.items() if c.lower() == wanted}
+        if not matches:
+            available = ", ".join(sorted(docs_by_category))
+            return f"No documents found in category **{category}**. Available categories: {available}."
+        docs_by_category = matches
 
     lines = ["**Available NovaPay Documentation:**\n"]
-    for category in sorted(docs_by_category):
-        lines.append(f"### {category}")
-        for title in sorted(docs_by_category[category]):
+    for doc_category in sorted(docs_by_category):
+        lines.append(f"### {doc_category}")
+        for title in docs_by_category[doc_category]:
             lines.append(f"- {title}")
         lines.append("")
 
@@ -88,6 +159,7 @@ ROUTE_SYSTEM_PROMPT = (
     "You have access to a `list_documents` tool that lists every document in the knowledge base. "
     "ONLY call the tool when the user EXPLICITLY asks to list, browse, or see all available documents "
     "(e.g. 'what documents do you have?', 'show me available docs', 'list all topics'). "
+    "If they ask about one category (e.g. 'which runbooks are there?'), pass it as `category`. "
     "Do NOT call the tool for ambiguous, short, or follow-up messages like 'yes', 'tell me more', 'go on', 'thanks', etc. "
     "For EVERYTHING else — including follow-ups, clarifications, and content questions — reply with the single word RAG."
 )
@@ -96,7 +168,7 @@ ROUTE_SYSTEM_PROMPT = (
 @ls.traceable(name="route_query", run_type="chain")
 async def route_query(question: str, history: list | None = None) -> AIMessage:
     """Ask the LLM whether to use a tool or fall through to RAG."""
-    llm = ChatOpenAI(model=LLM_MODEL, temperature=0).bind_tools([list_documents])
+    llm = get_chat_model().bind_tools([list_documents])
     messages = [SystemMessage(content=ROUTE_SYSTEM_PROMPT)]
     if history:
         messages.extend(history)
@@ -105,12 +177,37 @@ async def route_query(question: str, history: list | None = None) -> AIMessage:
     return response
 
 
+def index_manager():
+    """The in-process vector index manager, or None when querying Chroma."""
+    # Deferred: numpy and the index code are only needed with VECTOR_INDEX=exact|ivf
+    if VECTOR_INDEX == "chroma":
+        return None
+    from backend.vector_index import get_index_manager
+
+    return get_index_manager()
+
+
 @ls.traceable(name="retrieve_documents", run_type="retriever")
-def retrieve_documents(question: str, metadata: dict | None = None) -> list[Document]:
+async def retrieve_documents(question: str, metadata: dict | None = None) -> list[Document]:
     """Retrieve relevant documents from the vector store."""
+    # Concurrent questions share one batched embeddings call (see query_embeddings)
+    embedding = await get_query_embedder().aembed_query(question)
+
+    manager = index_manager()
+    index = manager.get() if manager else None
+    if index is not None:
+        return await index.asearch(embedding, k=RETRIEVER_K)
+
     vectorstore = _get_vectorstore()
-    retriever = vectorstore.as_retriever(search_kwargs={"k": RETRIEVER_K})
-    docs = retriever.invoke(question)
+    results = await asyncio.to_thread(
+        vectorstore.similarity_search_by_vector_with_relevance_scores, embedding, k=RETRIEVER_K
+    )
+    space = (vectorstore._collection.metadata or {}).get("hnsw:space", "l2")
+    docs = []
+    for doc, distance in results:
+        # Chroma returns distances; expose cosine similarity like the in-process index
+        doc.metadata["score"] = 1 - distance / 2 if space == "l2" else 1 - distance
+        docs.append(doc)
     return docs
 
 
@@ -140,6 +237,32 @@ def _extract_sources(docs: list[Document]) -> list[dict]:
     return sources
 
 
+TRUNCATION_MARKER = "\n\n[response interrupted]"
+
+# Stream outcomes for /api/metrics. Token counts are streamed chunks, which
+# map ~1:1 to LLM tokens; savings are estimated from the completed average.
+stream_stats = {
+    "completed": 0,
+    "cancelled": 0,
+    "completed_tokens": 0,
+    "tokens_before_cancel": 0,
+    "estimated_tokens_saved": 0,
+}
+
+
+def _record_completed(n_tokens: int) -> None:
+    stream_stats["completed"] += 1
+    stream_stats["completed_tokens"] += n_tokens
+
+
+def _record_cancelled(n_tokens: int) -> None:
+    stream_stats["cancelled"] += 1
+    stream_stats["tokens_before_cancel"] += n_tokens
+    if stream_stats["completed"]:
+        average = stream_stats["completed_tokens"] / stream_stats["completed"]
+        stream_stats["estimated_tokens_saved"] += max(0, round(average - n_tokens))
+
+
 def _reduce_stream_chunks(chunks: list[dict]) -> dict:
     """Aggregate streamed chunks into a single trace output for LangSmith."""
     content = []
@@ -152,66 +275,145 @@ def _reduce_stream_chunks(chunks: list[dict]) -> dict:
     return {"content": "".join(content), "sources": sources}
 
 
-@ls.traceable(name="rag_stream", run_type="chain", reduce_fn=_reduce_stream_chunks)
-async def stream_rag_response(
-    question: str, metadata: dict | None = None
+async def _answer_stream(
+    question: str,
+    metadata: dict | None,
+    history_messages: list | None,
+    ls_extra: dict,
+    origin: dict,
 ) -> AsyncIterator[dict]:
-    """Streaming RAG pipeline with tool-calling routing."""
-    # Propagate session_id to all child runs for proper thread grouping
-    session_id = (metadata or {}).get("thread_id")
-    ls_extra = {"metadata": {"session_id": session_id}} if session_id else {}
-
-    # Load server-side history and record the user message
-    history = get_session_history(session_id) if session_id else None
-    if history:
-        history.add_user_message(question)
-
-    history_messages = history.messages[:-1] if history else None  # exclude current question
+    """Route, retrieve and generate; yields token/sources/done chunks.
 
+    Sets ``origin["kind"]`` to how the tokens are produced: ``"llm"`` when
+    streamed from a model, ``"direct"`` for a rendered tool result, and
+    ``"buffered"`` for an accepted cascade answer sent as one chunk.
+    """
     route_response = await route_query(question, history=history_messages, langsmith_extra=ls_extra)
 
     if route_response.tool_calls:
         tool_call = route_response.tool_calls[0]
         tool_result = list_documents.invoke(tool_call["args"])
 
-        llm = ChatOpenAI(model=LLM_MODEL, temperature=0)
+        if LIST_DOCS_PRESENTATION == "direct":
+            # The tool output is already markdown; stream it as-is instead of
+            # paying for a second LLM round trip to restate it
+            origin["kind"] = "direct"
+            for line in tool_result.splitlines(keepends=True):
+                yield {"type": "token", "content": line}
+            yield {"type": "sources", "content": []}
+            yield {"type": "done"}
+            return
+
+        llm = get_chat_model()
         messages = [
             SystemMessage(content="Present the tool results to the user in a helpful way."),
             HumanMessage(content=question),
             route_response,
             ToolMessage(content=tool_result, tool_call_id=tool_call["id"]),
         ]
-        full_response = ""
+        origin["kind"] = "llm"
         async for chunk in llm.astream(messages):
             if chunk.content:
-                full_response += chunk.content
                 yield {"type": "token", "content": chunk.content}
 
-        if history:
-            history.add_ai_message(full_response)
-
         yield {"type": "sources", "content": []}
         yield {"type": "done"}
         return
 
-    docs = retrieve_documents(question, metadata=metadata, langsmith_extra=ls_extra)
-    context = format_context(docs, langsmith_extra=ls_extra)
-
+    docs = await retrieve_documents(question, metadata=metadata, langsmith_extra=ls_extra)
     chain = _get_chain()
 
+    if PROMPT_LAYOUT == "cache":
+        # Static rules and pinned docs first, retrieved context last (see prompt_layout)
+        pinned, pinned_sources = pinned_context(lambda: _get_vectorstore()._collection)
+        chain = cache_friendly_prompt(chain.first, pinned) | chain.last
+        context = format_context(order_for_cache(docs, pinned_sources), langsmith_extra=ls_extra)
+        grounding = f"{pinned}\n\n{context}"
+    else:
+        context = format_context(docs, langsmith_extra=ls_extra)
+        grounding = context
+
     chain_input = {"context": context, "question": question}
     if history_messages:
         chain_input["history"] = history_messages
 
-    full_response = ""
+    policy = policy_for(PROMPT_TAG)
+    if policy.enabled:
+        # Cheap model first; escalate only when a local signal fires
+        reasons = retrieval_signals(docs, policy)
+        if not reasons:
+            fast_chain = chain.first | get_chat_model(policy.fast_model)
+            message = await fast_chain.ainvoke(chain_input)
+            record_usage(message.usage_metadata)
+            answer = message.content
+            reasons = answer_signals(answer, policy, grounding)
+        record_outcome(reasons)
+        if not reasons:
+            # Buffered for the checks above, so it arrives as one chunk
+            origin["kind"] = "buffered"
+            yield {"type": "token", "content": answer}
+            yield {"type": "sources", "content": _extract_sources(docs)}
+            yield {"type": "done"}
+            return
+        logger.info(f"Cascade escalated to strong model: {', '.join(reasons)}")
+        if policy.strong_model:
+            chain = chain.first | get_chat_model(policy.strong_model).bind(stream_usage=True)
+
+    origin["kind"] = "llm"
     async for chunk in chain.astream(chain_input):
         if chunk.content:
-            full_response += chunk.content
             yield {"type": "token", "content": chunk.content}
-
-    if history:
-        history.add_ai_message(full_response)
+        if chunk.usage_metadata:
+            record_usage(chunk.usage_metadata)
 
     sources = _extract_sources(docs)
     yield {"type": "sources", "content": sources}
     yield {"type": "done"}
+
+
+@ls.traceable(name="rag_stream", run_type="chain", reduce_fn=_reduce_stream_chunks)
+async def stream_rag_response(
+    question: str, metadata: dict | None = None
+) -> AsyncIterator[dict]:
+    """Streaming RAG pipeline with tool-calling routing.
+
+    If the consumer is cancelled mid-stream (the SSE client disconnected),
+    the cancellation propagates into whichever router, retrieval or LLM call
+    is in flight, and the partial answer is kept in session history with a
+    truncation marker.
+    """
+    # Propagate session_id to all child runs for proper thread grouping
+    session_id = (metadata or {}).get("thread_id")
+    ls_extra = {"metadata": {"session_id": session_id}} if session_id else {}
+
+    # Load server-side history and record the user message
+    history = get_session_history(session_id) if session_id else None
+    if history:
+        history.add_user_message(question)
+
+    history_messages = history.messages[:-1] if history else None  # exclude current question
+
+    # Stream stats only cover model-streamed answers: direct renders and
+    # buffered cascade answers would skew the per-stream token average
+    tokens: list[str] = []
+    origin: dict = {"kind": None}
+    finished = False
+    try:
+        async for chunk in _answer_stream(question, metadata, history_messages, ls_extra, origin):
+            if chunk["type"] == "token":
+                tokens.append(chunk["content"])
+            elif chunk["type"] == "done":
+                if history:
+                    history.add_ai_message("".join(tokens))
+                if origin["kind"] == "llm":
+                    _record_completed(len(tokens))
+                finished = True
+            yield chunk
+    except (asyncio.CancelledError, GeneratorExit):
+        if not finished:
+            if history:
+                history.add_ai_message("".join(tokens) + TRUNCATION_MARKER)
+            if origin["kind"] in (None, "llm"):
+                _record_cancelled(len(tokens))
+            logger.info(f"Stream cancelled after {len(tokens)} tokens (session {session_id})")
+        raise
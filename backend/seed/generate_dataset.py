@@ -3,30 +3,39 @@
 Runs the real RAG pipeline (retrieve from ChromaDB + prompt + LLM) multiple times
 per question, synthesizes the outputs, and writes the result to golden_dataset.json.
 
+All questions are processed concurrently under one global limit on in-flight LLM
+calls. Each finished example is appended to a checkpoint file, so re-running an
+interrupted job picks up where it stopped.
+
 Usage:
     cd backend && uv run python -m seed.generate_dataset
+    cd backend && uv run python -m seed.generate_dataset --questions questions.txt --concurrency 32
 """
 
+import argparse
 import asyncio
 import json
 import os
 import sys
 
 from langchain_chroma import Chroma
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.documents import Document
+from langchain_openai import ChatOpenAI
 from langsmith import Client
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from clients import get_chat_model, get_embeddings
+from collection_alias import resolve_collection
 from config import (
     CHROMA_PERSIST_DIR,
-    COLLECTION_NAME,
-    EMBEDDING_MODEL,
-    LLM_MODEL,
     PROMPT_NAME,
     RETRIEVER_K,
 )
 
 N_SAMPLES = 4
+CONCURRENCY = 16  # max in-flight LLM calls across all questions
+
+OUT_PATH = os.path.join(os.path.dirname(__file__), "golden_dataset.json")
 
 QUESTIONS = [
     "What's the rate limit on the payments API?",
@@ -54,17 +63,36 @@ Question: {question}
 Write the synthesized reference answer:"""
 
 
-def _retrieve_context(question: str) -> str:
-    persist_dir = os.path.abspath(CHROMA_PERSIST_DIR)
-    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
-    vectorstore = Chroma(
-        collection_name=COLLECTION_NAME,
-        persist_directory=persist_dir,
-        embedding_function=embeddings,
-    )
-    retriever = vectorstore.as_retriever(search_kwargs={"k": RETRIEVER_K})
-    docs = retriever.invoke(question)
 
+def load_questions(path: str | None) -> list[str]:
+    """Questions from a JSON list, JSONL (``{"question": ...}`` per line) or text file."""
+    if path is None:
+        return QUESTIONS
+    with open(path) as f:
+        raw = f.read()
+    if path.endswith(".json"):
+        return json.loads(raw)
+    if path.endswith(".jsonl"):
+        return [json.loads(line)["question"] for line in raw.splitlines() if line.strip()]
+    return [line.strip() for line in raw.splitlines() if line.strip()]
+
+
+def _load_checkpoint(path: str) -> dict[str, dict]:
+    """Finished examples keyed by question; tolerates a truncated last line."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                example = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[example["inputs"]["question"]] = example
+    return done
+
+
+def _format_context(docs: list[Document]) -> str:
     parts = []
     for i, doc in enumerate(docs, 1):
         source = doc.metadata.get("source", "unknown")
@@ -72,50 +100,97 @@ def _retrieve_context(question: str) -> str:
     return "\n\n---\n\n".join(parts)
 
 
-async def _generate_samples(question: str, context: str, chain, n: int) -> list[str]:
-    tasks = [chain.ainvoke({"context": context, "question": question}) for _ in range(n)]
-    responses = await asyncio.gather(*tasks)
-    return [r.content for r in responses]
+async def _generate_samples(
+    question: str, context: str, chain, n: int, limit: asyncio.Semaphore
+) -> list[str]:
+    async def sample() -> str:
+        async with limit:
+            response = await chain.ainvoke({"context": context, "question": question})
+        return response.content
 
+    return await asyncio.gather(*(sample() for _ in range(n)))
 
-async def _synthesize(question: str, samples: list[str], llm: ChatOpenAI) -> str:
+
+async def _synthesize(
+    question: str, samples: list[str], llm: ChatOpenAI, limit: asyncio.Semaphore
+) -> str:
     numbered = "\n\n".join(
         f"--- Response {i + 1} ---\n{s}" for i, s in enumerate(samples)
     )
     prompt = SYNTHESIS_PROMPT.format(n=len(samples), question=question, responses=numbered)
-    response = await llm.ainvoke(prompt)
+    async with limit:
+        response = await llm.ainvoke(prompt)
     return response.content
 
 
 async def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate golden dataset reference answers")
+    parser.add_argument("--questions", help="JSON, JSONL or text file of questions (default: built-in list)")
+    parser.add_argument("--out", default=OUT_PATH, help="Output JSON path (default: seed/golden_dataset.json)")
+    parser.add_argument("--samples", type=int, default=N_SAMPLES, help=f"Samples per question (default: {N_SAMPLES})")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help=f"Max in-flight LLM calls (default: {CONCURRENCY})")
+    parser.add_argument("--fresh", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args()
+
+    questions = list(dict.fromkeys(load_questions(args.questions)))
+    checkpoint_path = f"{args.out}.checkpoint.jsonl"
+    if args.fresh and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    done = _load_checkpoint(checkpoint_path)
+    pending = [q for q in questions if q not in done]
+    print(f"{len(questions)} questions, {len(questions) - len(pending)} already done, {len(pending)} to go")
+
     ls_client = Client()
     prompt = ls_client.pull_prompt(f"{PROMPT_NAME}:latest")
-    llm = ChatOpenAI(model=LLM_MODEL, temperature=0)
+    llm = get_chat_model()
     chain = prompt | llm
+    limit = asyncio.Semaphore(args.concurrency)
 
-    examples = []
-
-    for i, question in enumerate(QUESTIONS, 1):
-        print(f"[{i}/{len(QUESTIONS)}] {question}")
-
-        context = _retrieve_context(question)
-
-        print(f"  Generating {N_SAMPLES} samples...")
-        samples = await _generate_samples(question, context, chain, N_SAMPLES)
-
-        print(f"  Synthesizing reference answer...")
-        reference = await _synthesize(question, samples, llm)
-
-        examples.append({
-            "inputs": {"question": question, "context": context},
-            "outputs": {"answer": reference},
-        })
+    vectorstore = Chroma(
+        collection_name=resolve_collection(),
+        persist_directory=os.path.abspath(CHROMA_PERSIST_DIR),
+        embedding_function=get_embeddings(),
+    )
 
-    out_path = os.path.join(os.path.dirname(__file__), "golden_dataset.json")
-    with open(out_path, "w") as f:
+    finished = len(questions) - len(pending)
+    with open(checkpoint_path, "a") as checkpoint:
+
+        async def run(question: str, embedding: list[float]) -> None:
+            nonlocal finished
+            docs = await vectorstore.asimilarity_search_by_vector(embedding, k=RETRIEVER_K)
+            context = _format_context(docs)
+            samples = await _generate_samples(question, context, chain, args.samples, limit)
+            reference = await _synthesize(question, samples, llm, limit)
+
+            example = {
+                "inputs": {"question": question, "context": context},
+                "outputs": {"answer": reference},
+            }
+            checkpoint.write(json.dumps(example) + "\n")
+            checkpoint.flush()
+            done[question] = example
+            finished += 1
+            print(f"[{finished}/{len(questions)}] {question}")
+
+        # One bulk embeddings call for every pending question, then fan out
+        embeddings = await get_embeddings().aembed_documents(pending) if pending else []
+        results = await asyncio.gather(
+            *(run(q, e) for q, e in zip(pending, embeddings)), return_exceptions=True
+        )
+
+    failed = [(q, r) for q, r in zip(pending, results) if isinstance(r, Exception)]
+    if failed:
+        for question, error in failed[:10]:
+            print(f"  Failed: {question} ({error!r})")
+        print(f"\n{len(failed)} questions failed; re-run to resume from {checkpoint_path}")
+        sys.exit(1)
+
+    examples = [done[q] for q in questions]
+    with open(args.out, "w") as f:
         json.dump(examples, f, indent=2)
+    os.remove(checkpoint_path)
 
-    print(f"\nWrote {len(examples)} examples to {out_path}")
+    print(f"\nWrote {len(examples)} examples to {args.out}")
 
 
 if __name__ == "__main__":
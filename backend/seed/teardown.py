@@ -1,71 +1,205 @@
-"""Delete all LangSmith resources: prompts, datasets, experiments, annotation queues, and tracing projects."""
+"""Delete all LangSmith resources: prompts, datasets, experiments, annotation queues, and tracing projects.
 
+Deletes run concurrently on a thread pool, paced by a shared token bucket.
+The bucket's rate adapts to the server: it halves on every 429 and honours
+Retry-After, then creeps back up while deletes succeed (AIMD). The client's
+own HTTP retries are turned off so every 429 reaches the bucket instead of
+being slept through inside a worker thread.
+"""
+
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable
 
 from langsmith import Client
 from langsmith.utils import LangSmithNotFoundError, LangSmithRateLimitError
+from urllib3.util.retry import Retry
+
+MAX_WORKERS = 8  # concurrent delete calls
+INITIAL_RATE = 5.0  # deletes per second to start with
+MIN_RATE = 0.2
+MAX_RATE = 25.0
+RATE_INCREASE = 0.25  # added to the rate after each success
+BURST = 5  # bucket capacity
+RETRIES = 6
+DEFAULT_BACKOFF = 2.0  # seconds to pause on 429 without Retry-After
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe token bucket whose refill rate adapts to 429 responses."""
+
+    def __init__(
+        self,
+        rate: float = INITIAL_RATE,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        burst: int = BURST,
+    ) -> None:
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.rate_limited = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+    def on_rate_limited(self, retry_after: float | None) -> None:
+        with self._lock:
+            self.rate_limited += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0
+            now = time.monotonic()
+            self._updated = now
+            self._paused_until = max(self._paused_until, now + (retry_after or DEFAULT_BACKOFF))
+
+
+def _retry_after(error: LangSmithRateLimitError) -> float | None:
+    """Retry-After seconds from the HTTP error the LangSmith client wrapped."""
+    # The client re-wraps requests' HTTPError, so walk the chain for the response
+    exc = error.__context__
+    while exc is not None:
+        response = getattr(exc, "response", None)
+        if response is not None:
+            try:
+                return float(response.headers["Retry-After"])
+            except (KeyError, ValueError):
+                return None
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class _Progress:
+    """Per-resource-type outcome counts, safe to update from worker threads."""
 
-RATE_LIMIT_WAIT = 30  # seconds to wait on 429
-DELETE_DELAY = 2  # seconds between every delete call to stay under rate limit
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.counts: dict[str, Counter] = {}
+        self._done = 0
+        self._lock = threading.Lock()
 
+    def record(self, kind: str, outcome: str, label: str) -> None:
+        with self._lock:
+            self.counts.setdefault(kind, Counter())[outcome] += 1
+            self._done += 1
+            print(f"  [{self._done}/{self.total}] {outcome}: {label}")
 
-def _delete_with_retry(fn, label: str, retries: int = 3) -> None:
-    """Call *fn* with retry on rate-limit errors. Skips on final failure."""
-    for attempt in range(1, retries + 1):
+    def summary(self) -> None:
+        print(f"\n{'Resource':<20} {'deleted':>8} {'missing':>8} {'skipped':>8}")
+        for kind, counts in self.counts.items():
+            print(f"{kind:<20} {counts['deleted']:>8} {counts['missing']:>8} {counts['skipped']:>8}")
+
+
+def _delete_with_retry(
+    fn, label: str, kind: str, limiter: AdaptiveRateLimiter, progress: _Progress, retries: int = RETRIES
+) -> None:
+    """Call *fn* under the rate limiter, retrying on rate-limit errors. Skips on final failure."""
+    for _ in range(retries):
+        limiter.acquire()
         try:
             fn()
-            print(f"  Deleted {label}")
-            time.sleep(DELETE_DELAY)
+            limiter.on_success()
+            progress.record(kind, "deleted", label)
             return
         except LangSmithNotFoundError:
-            print(f"  Already deleted: {label}")
+            limiter.on_success()
+            progress.record(kind, "missing", label)
             return
-        except LangSmithRateLimitError:
-            if attempt < retries:
-                wait = RATE_LIMIT_WAIT * attempt
-                print(f"  Rate-limited on {label}, waiting {wait}s (attempt {attempt}/{retries})...")
-                time.sleep(wait)
-            else:
-                print(f"  Skipping {label} after {retries} rate-limit failures")
-                return
-
-
-def teardown() -> None:
-    client = Client()
-
-    # Prompts
-    print("\n[Prompts]")
-    resp = client.list_prompts(is_public=False)
-    for prompt in resp.repos:
-        _delete_with_retry(
-            lambda p=prompt: client.delete_prompt(prompt_identifier=p.repo_handle),
-            f"prompt: {prompt.repo_handle}",
-        )
+        except LangSmithRateLimitError as e:
+            limiter.on_rate_limited(_retry_after(e))
+    progress.record(kind, "skipped", label)
+
+
+def _list_resources(client: Client) -> dict[str, list[tuple[str, Callable[[], None]]]]:
+    """(label, delete fn) pairs for each resource type, listed in parallel."""
+
+    def prompts():
+        return [
+            (f"prompt: {p.repo_handle}", lambda p=p: client.delete_prompt(prompt_identifier=p.repo_handle))
+            for p in client.list_prompts(is_public=False).repos
+        ]
 
     # Datasets (cascade-deletes associated experiments)
-    print("\n[Datasets]")
-    for dataset in client.list_datasets():
-        _delete_with_retry(
-            lambda d=dataset: client.delete_dataset(dataset_id=d.id),
-            f"dataset: {dataset.name}",
-        )
+    def datasets():
+        return [
+            (f"dataset: {d.name}", lambda d=d: client.delete_dataset(dataset_id=d.id))
+            for d in client.list_datasets()
+        ]
 
     # Tracing projects (skip experiment projects — already removed with datasets)
-    print("\n[Tracing Projects]")
-    for project in client.list_projects():
-        if project.reference_dataset_id is not None:
-            continue
-        _delete_with_retry(
-            lambda p=project: client.delete_project(project_name=p.name),
-            f"project: {project.name}",
-        )
-
-    # Annotation Queues
-    print("\n[Annotation Queues]")
-    for queue in client.list_annotation_queues():
-        _delete_with_retry(
-            lambda q=queue: client.delete_annotation_queue(queue_id=q.id),
-            f"annotation queue: {queue.name}",
-        )
-
-    print("\nTeardown complete.")
+    def projects():
+        return [
+            (f"project: {p.name}", lambda p=p: client.delete_project(project_name=p.name))
+            for p in client.list_projects()
+            if p.reference_dataset_id is None
+        ]
+
+    def queues():
+        return [
+            (f"annotation queue: {q.name}", lambda q=q: client.delete_annotation_queue(queue_id=q.id))
+            for q in client.list_annotation_queues()
+        ]
+
+    listers = {
+        "Prompts": prompts,
+        "Datasets": datasets,
+        "Tracing Projects": projects,
+        "Annotation Queues": queues,
+    }
+    with ThreadPoolExecutor(max_workers=len(listers)) as pool:
+        futures = {kind: pool.submit(fn) for kind, fn in listers.items()}
+    return {kind: future.result() for kind, future in futures.items()}
+
+
+def teardown(
+    client: Client | None = None,
+    max_workers: int = MAX_WORKERS,
+    limiter: AdaptiveRateLimiter | None = None,
+) -> None:
+    client = client or Client(retry_config=Retry(total=0, raise_on_status=False))
+    start = time.monotonic()
+
+    resources = _list_resources(client)
+    total = sum(len(items) for items in resources.values())
+    print("\n" + ", ".join(f"{len(items)} {kind.lower()}" for kind, items in resources.items()))
+
+    limiter = limiter or AdaptiveRateLimiter()
+    progress = _Progress(total)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_delete_with_retry, fn, label, kind, limiter, progress)
+            for kind, items in resources.items()
+            for label, fn in items
+        ]
+        wait(futures)
+    for future in futures:
+        future.result()  # surface unexpected errors
+
+    progress.summary()
+    print(
+        f"\nTeardown complete in {time.monotonic() - start:.1f}s "
+        f"({limiter.rate_limited} rate-limit responses, final rate {limiter.rate:.1f}/s)."
+    )
@@ -0,0 +1,122 @@
+"""SSE helpers: token coalescing and event encoding for the chat stream."""
+
+import asyncio
+import json
+import os
+import sys
+from collections import deque
+from typing import AsyncIterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.config import STREAM_COALESCE_CHARS, STREAM_COALESCE_MS
+
+try:
+    import orjson
+except ImportError:  # optional speedup, falls back to the stdlib encoder
+    orjson = None
+
+STREAM_FORMATS = ("json", "compact")
+
+
+def dumps(obj) -> str:
+    """Serialize an event payload to a compact JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_event(chunk: dict, stream_format: str = "json") -> dict:
+    """Turn a pipeline chunk into an sse-starlette event dict.
+
+    ``json`` is the original format: every event is a JSON object on the
+    default ``message`` event. ``compact`` sends tokens as a named ``token``
+    event whose data is just the JSON-encoded text, without the wrapping
+    object; all other event types are unchanged. The text must stay encoded:
+    raw newlines would be split into SSE ``data:`` lines, and clients drop
+    empty ones when joining them back.
+    """
+    if stream_format == "compact" and chunk.get("type") == "token":
+        return {"event": "token", "data": dumps(chunk["content"])}
+    return {"data": dumps(chunk)}
+
+
+async def coalesce_tokens(
+    chunks: AsyncIterator[dict],
+    max_chars: int = STREAM_COALESCE_CHARS,
+    max_ms: int = STREAM_COALESCE_MS,
+) -> AsyncIterator[dict]:
+    """Merge consecutive ``token`` chunks into fewer, larger ones.
+
+    Buffered text is flushed once it reaches *max_chars*, once *max_ms* have
+    passed since the first buffered token (even if upstream is stalled), or
+    right before any non-token chunk so ordering is preserved. Setting either
+    limit to 0 disables coalescing.
+    """
+    if max_chars <= 0 or max_ms <= 0:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    loop = asyncio.get_running_loop()
+    ready: deque[dict] = deque()
+    wake = asyncio.Event()
+    buffer: list[str] = []
+    size = 0
+    timer: asyncio.TimerHandle | None = None
+    finished = False
+    error: Exception | None = None
+
+    def flush() -> None:
+        nonlocal buffer, size, timer
+        if timer is not None:
+            timer.cancel()
+            timer = None
+        if buffer:
+            ready.append({"type": "token", "content": "".join(buffer)})
+            buffer, size = [], 0
+
+    def on_timer() -> None:
+        nonlocal timer
+        timer = None
+        flush()
+        wake.set()
+
+    async def pump() -> None:
+        # Upstream runs in its own task so the timer can flush while it stalls
+        nonlocal size, timer, finished, error
+        try:
+            async for chunk in chunks:
+                if chunk.get("type") == "token":
+                    buffer.append(chunk["content"])
+                    size += len(chunk["content"])
+                    if size >= max_chars:
+                        flush()
+                        wake.set()
+                    elif timer is None:
+                        timer = loop.call_later(max_ms / 1000, on_timer)
+                else:
+                    flush()
+                    ready.append(chunk)
+                    wake.set()
+        except Exception as e:
+            error = e
+        finally:
+            flush()
+            finished = True
+            wake.set()
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            await wake.wait()
+            wake.clear()
+            while ready:
+                yield ready.popleft()
+            if finished:
+                if error is not None:
+                    raise error
+                return
+    finally:
+        if timer is not None:
+            timer.cancel()
+        task.cancel()
@@ -0,0 +1,6 @@
+import os
+
+# Keep tests offline: no LangSmith tracing, and a placeholder key so OpenAI clients can be built
+os.environ["LANGSMITH_TRACING"] = "false"
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
@@ -0,0 +1,82 @@
+"""A client disconnect must abort the in-flight upstream call promptly."""
+
+import asyncio
+import time
+
+import pytest
+
+import backend.rag_chain as rag_chain
+from backend.streaming import coalesce_tokens
+
+ABORT_BUDGET_S = 0.1
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stats(monkeypatch):
+    monkeypatch.setattr(rag_chain, "stream_stats", {k: 0 for k in rag_chain.stream_stats})
+    monkeypatch.setattr(rag_chain, "_history_store", {})
+
+
+def _fake_answer_stream(upstream: dict, kind: str = "llm", n_tokens: int = 3, stall: bool = True):
+    async def fake(question, metadata, history_messages, ls_extra, origin):
+        origin["kind"] = kind
+        try:
+            for i in range(n_tokens):
+                yield {"type": "token", "content": f"tok{i} "}
+            if stall:
+                await asyncio.sleep(3600)  # a slow upstream generation
+            yield {"type": "sources", "content": []}
+            yield {"type": "done"}
+        except asyncio.CancelledError:
+            upstream["cancelled_at"] = time.perf_counter()
+            raise
+
+    return fake
+
+
+async def _consume_then_disconnect(n_events: int) -> float:
+    """Read *n_events* like the SSE handler does, then cancel as sse-starlette would."""
+    received = []
+
+    async def handler():
+        stream = rag_chain.stream_rag_response("question", metadata={"thread_id": "t1"})
+        async for chunk in coalesce_tokens(stream, max_chars=1, max_ms=5):
+            received.append(chunk)
+
+    task = asyncio.create_task(handler())
+    while len(received) < n_events:
+        await asyncio.sleep(0.001)
+    disconnected_at = time.perf_counter()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    return disconnected_at
+
+
+def test_disconnect_aborts_upstream_within_budget(monkeypatch):
+    upstream: dict = {}
+    monkeypatch.setattr(rag_chain, "_answer_stream", _fake_answer_stream(upstream))
+
+    disconnected_at = asyncio.run(_consume_then_disconnect(n_events=3))
+
+    assert "cancelled_at" in upstream, "upstream call was not cancelled"
+    assert upstream["cancelled_at"] - disconnected_at < ABORT_BUDGET_S
+
+    history = rag_chain.get_session_history("t1").messages
+    assert history[-1].content == "tok0 tok1 tok2 " + rag_chain.TRUNCATION_MARKER
+    assert rag_chain.stream_stats["cancelled"] == 1
+    assert rag_chain.stream_stats["tokens_before_cancel"] == 3
+    assert rag_chain.stream_stats["completed"] == 0
+
+
+def test_only_llm_streams_count_as_completed(monkeypatch):
+    async def run(kind: str, n_tokens: int):
+        monkeypatch.setattr(rag_chain, "_answer_stream", _fake_answer_stream({}, kind, n_tokens, stall=False))
+        return [chunk async for chunk in rag_chain.stream_rag_response("question")]
+
+    asyncio.run(run("llm", 10))
+    asyncio.run(run("direct", 25))
+    asyncio.run(run("buffered", 1))
+
+    assert rag_chain.stream_stats["completed"] == 1
+    assert rag_chain.stream_stats["completed_tokens"] == 10
@@ -0,0 +1,96 @@
+"""Tests for the cascade's local escalation signals."""
+
+import pytest
+from langchain_core.documents import Document
+
+from backend.cascade import CascadePolicy, _parse_policies, answer_signals, retrieval_signals
+
+POLICY = CascadePolicy(enabled=True)
+
+CONTEXT = """[Document 1: standards/api-design-guidelines.md]
+All NovaPay APIs enforce a default rate limit of **500 requests per minute** per API key.
+The payments API allows 100 requests per minute; the users API allows 50 requests per minute.
+Rollbacks take 5 minutes and a full deploy takes 20 minutes.
+Retry after 1 second, then 2 seconds, then 4 seconds.
+
+[Document 2: services/payments-api.md]
+Each merchant may send 1000 requests per minute; enterprise merchants may send 2,500 requests per minute."""
+
+
+def _doc(source: str, score: float | None = None) -> Document:
+    metadata = {"source": source}
+    if score is not None:
+        metadata["score"] = score
+    return Document(page_content="...", metadata=metadata)
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [
+        "Rollbacks take 5 minutes; a full deploy takes 20 minutes.",
+        "The payments API allows 100 requests per minute, while the users API allows 50 requests per minute.",
+        "Wait 1 second, then 2 seconds (api-design-guidelines.md).",
+        "The payments API allows 100 requests per minute … the users API allows 50 requests per minute.",
+        "100 requests per minute … 50 requests per minute",
+        "Step 1 and step 2 and step 3.",
+        "Use idempotency keys to avoid inconsistent payment state.",
+        "The default limit is 500 requests per minute (standards/api-design-guidelines.md).",
+        "The limit is 1,000 requests per minute per merchant.",
+        "Merchants get 1,000 requests per minute, and 2,500 requests per minute on the enterprise plan.",
+    ],
+)
+def test_ordinary_answers_are_accepted(answer):
+    assert answer_signals(answer, POLICY, CONTEXT) == []
+
+
+def test_fallback_answer_escalates():
+    answer = "I don’t have documentation on that topic."
+    assert answer_signals(answer, POLICY, CONTEXT) == ["fallback_answer"]
+
+
+def test_same_subject_different_values_escalates():
+    answer = (
+        "The rate limit is 500 requests per minute according to api-design-guidelines.md, "
+        "but payments-api.md states a rate limit of 100 requests per minute."
+    )
+    assert "conflicting_numbers" in answer_signals(answer, POLICY, CONTEXT)
+
+
+def test_thousands_separators_keep_the_whole_value():
+    answer = "The payments rate limit is 1,500 requests per minute. The payments rate limit is 2,500 requests per minute."
+    assert answer_signals(answer, POLICY, CONTEXT) == ["conflicting_numbers", "unsupported_number"]
+    assert answer_signals("Merchants may send 1,500 requests per minute.", POLICY, "Up to 500 requests per minute.") == [
+        "unsupported_number"
+    ]
+
+
+def test_number_missing_from_context_escalates():
+    answer = "The default rate limit is 750 requests per minute."
+    assert answer_signals(answer, POLICY, CONTEXT) == ["unsupported_number"]
+
+
+def test_unsupported_number_check_needs_context():
+    assert answer_signals("The default rate limit is 1,000 requests per minute.", POLICY) == []
+
+
+def test_signals_respect_policy_switches():
+    policy = CascadePolicy(escalate_on_fallback=False, escalate_on_unsupported_number=False)
+    assert answer_signals("I don't have documentation. It is 9 seconds.", policy, CONTEXT) == []
+
+
+def test_retrieval_signals():
+    assert retrieval_signals([], POLICY) == ["low_retrieval_score"]
+    assert retrieval_signals([_doc("a.md", 0.2), _doc("a.md", 0.1)], POLICY) == ["low_retrieval_score"]
+    assert retrieval_signals([_doc("a.md", 0.8), _doc("b.md", 0.5)], POLICY) == []
+    many = [_doc(f"{name}.md", 0.9) for name in "abcd"]
+    assert retrieval_signals(many, POLICY) == ["multi_doc_context"]
+    assert retrieval_signals([_doc("a.md")], POLICY) == []  # no scores, e.g. offline eval
+
+
+def test_policies_parsed_and_validated():
+    policies = _parse_policies('{"prod": {"enabled": true, "strong_model": "gpt-4o"}, "default": {}}')
+    assert policies["prod"].enabled and policies["prod"].strong_model == "gpt-4o"
+    assert _parse_policies("") == {}
+    for raw in ("{not json", '["prod"]', '{"prod": {"max_sources": "many"}}'):
+        with pytest.raises(ValueError, match="Invalid CASCADE_POLICIES"):
+            _parse_policies(raw)
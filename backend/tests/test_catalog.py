@@ -0,0 +1,37 @@
+"""The list_documents catalog must be keyed by the collection version it was read from."""
+
+import backend.boot_snapshot as boot_snapshot
+import backend.rag_chain as rag_chain
+
+
+class _FakeCollection:
+    def __init__(self, name: str, metadatas: list[dict]) -> None:
+        self.name = name
+        self._metadatas = metadatas
+
+    def get(self, include: list[str]) -> dict:
+        return {"metadatas": self._metadatas}
+
+
+class _FakeVectorstore:
+    def __init__(self, collection: _FakeCollection) -> None:
+        self._collection = collection
+
+
+def test_scan_during_switch_is_keyed_by_scanned_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(boot_snapshot, "BOOT_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(rag_chain, "_catalogs", {})
+    # The pointer already names v2, but the live handle is still warming v2 and serves v1
+    monkeypatch.setattr(rag_chain, "resolve_collection", lambda: "novapay_docs_v2")
+    old = _FakeCollection("novapay_docs_v1", [{"source": "api/old.md", "category": "api"}])
+    monkeypatch.setattr(rag_chain, "_get_vectorstore", lambda: _FakeVectorstore(old))
+
+    assert rag_chain.get_catalog() == {"api": ["api/old.md"]}
+    assert boot_snapshot.load_catalog("novapay_docs_v2") is None
+    assert boot_snapshot.load_catalog("novapay_docs_v1") == {"api": ["api/old.md"]}
+
+    # Once v2 is live, it gets its own catalog
+    new = _FakeCollection("novapay_docs_v2", [{"source": "api/new.md", "category": "api"}])
+    monkeypatch.setattr(rag_chain, "_get_vectorstore", lambda: _FakeVectorstore(new))
+    assert rag_chain.get_catalog() == {"api": ["api/new.md"]}
+    assert boot_snapshot.load_catalog("novapay_docs_v2") == {"api": ["api/new.md"]}
@@ -0,0 +1,41 @@
+"""Pinned documents are read from Chroma only when some are configured."""
+
+import backend.prompt_layout as prompt_layout
+
+
+class _FakeCollection:
+    name = "novapay_docs_v1"
+
+    def __init__(self) -> None:
+        self.gets = 0
+
+    def get(self, where: dict, include: list[str]) -> dict:
+        self.gets += 1
+        return {
+            "documents": ["Second part.", "First part."],
+            "metadatas": [
+                {"source": "standards/api.md", "start_index": 40},
+                {"source": "standards/api.md", "start_index": 0},
+            ],
+        }
+
+
+def _unreachable():
+    raise AssertionError("collection opened without pinned documents")
+
+
+def test_no_pinned_docs_never_opens_the_collection(monkeypatch):
+    monkeypatch.setattr(prompt_layout, "PINNED_DOCS", [])
+    assert prompt_layout.pinned_context(_unreachable) == ("", frozenset())
+
+
+def test_pinned_docs_are_read_once_per_collection(monkeypatch):
+    monkeypatch.setattr(prompt_layout, "_pinned_cache", {})
+    monkeypatch.setattr(prompt_layout, "PINNED_DOCS", ["standards/api.md", "missing.md"])
+    collection = _FakeCollection()
+
+    text, found = prompt_layout.pinned_context(lambda: collection)
+    assert text == "[Pinned: standards/api.md]\nFirst part.\nSecond part."
+    assert found == frozenset({"standards/api.md"})
+    assert prompt_layout.pinned_context(lambda: collection) == (text, found)
+    assert collection.gets == 1
@@ -0,0 +1,55 @@
+"""Round-trip tests for the SSE event encoding."""
+
+import json
+
+import pytest
+from sse_starlette.sse import ServerSentEvent
+
+from backend.streaming import encode_event
+
+TOKENS = ["\n\nTwo", "\n", "", "line one\nline two\n", "trailing\n\n", "  - item\r\n", 'quote " and \\ slash', "naïve ✓"]
+
+
+def _parse_like_fetch_event_source(raw: bytes) -> dict:
+    """Parse one SSE message the way @microsoft/fetch-event-source 2.0.1 does.
+
+    Data lines are joined as ``data ? data + "\\n" + value : value``, so
+    empty leading data lines are lost.
+    """
+    message = {"event": "", "data": ""}
+    for line in raw.decode().replace("\r\n", "\n").split("\n"):
+        if not line or ":" not in line:
+            continue
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "data":
+            message["data"] = message["data"] + "\n" + value if message["data"] else value
+        elif field == "event":
+            message["event"] = value
+    return message
+
+
+def _client_token(message: dict) -> str:
+    """Token text as frontend/src/lib/api.ts decodes it."""
+    if message["event"] == "token":
+        return json.loads(message["data"])
+    return json.loads(message["data"])["content"]
+
+
+@pytest.mark.parametrize("stream_format", ["json", "compact"])
+@pytest.mark.parametrize("token", TOKENS)
+def test_token_round_trip(stream_format, token):
+    event = encode_event({"type": "token", "content": token}, stream_format)
+    raw = ServerSentEvent(**event).encode()
+    assert _client_token(_parse_like_fetch_event_source(raw)) == token
+
+
+def test_compact_token_is_single_data_line():
+    event = encode_event({"type": "token", "content": "a\n\nb"}, "compact")
+    assert event["event"] == "token"
+    assert "\n" not in event["data"]
+
+
+def test_non_token_events_unchanged_in_compact():
+    chunk = {"type": "sources", "content": [{"file": "api/payments-api.md", "snippet": "..."}]}
+    assert encode_event(chunk, "compact") == encode_event(chunk, "json")
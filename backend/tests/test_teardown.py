@@ -0,0 +1,91 @@
+"""Teardown against a local fake LangSmith server that enforces a rate limit."""
+
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Imported as a module: pytest treats module-level `teardown`/`teardown_module` as xunit hooks
+import backend.seed.teardown as langsmith_teardown
+
+MIN_INTERVAL = 0.1  # the fake server accepts one delete per 100ms
+
+
+class _RateLimitedServer(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.deleted: list[str] = []
+        self.rejected = 0
+        self.last_accepted = 0.0
+        self.lock = threading.Lock()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _RateLimitedServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, status: int, headers: dict | None = None, body: bytes = b"") -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self._reply(200, {"Content-Type": "application/json"}, b"{}")  # /info
+
+    def do_DELETE(self) -> None:
+        with self.server.lock:
+            now = time.monotonic()
+            if now - self.server.last_accepted < MIN_INTERVAL:
+                self.server.rejected += 1
+                limited = True
+            else:
+                self.server.last_accepted = now
+                self.server.deleted.append(self.path)
+                limited = False
+        if limited:
+            self._reply(429, {"Retry-After": "1"})
+        else:
+            self._reply(200, {"Content-Type": "application/json"}, b"{}")
+
+
+@pytest.fixture
+def server():
+    srv = _RateLimitedServer()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_teardown_deletes_everything_and_backs_off(server, monkeypatch):
+    # teardown() builds its own client, so point it at the fake server
+    monkeypatch.setenv("LANGSMITH_ENDPOINT", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("LANGSMITH_API_KEY", "test")
+    datasets = [uuid.uuid4() for _ in range(8)]
+    queues = [uuid.uuid4() for _ in range(6)]
+    monkeypatch.setattr(
+        langsmith_teardown,
+        "_list_resources",
+        lambda client: {
+            "Datasets": [(f"dataset: {d}", lambda d=d: client.delete_dataset(dataset_id=d)) for d in datasets],
+            "Annotation Queues": [
+                (f"annotation queue: {q}", lambda q=q: client.delete_annotation_queue(queue_id=q)) for q in queues
+            ],
+        },
+    )
+
+    limiter = langsmith_teardown.AdaptiveRateLimiter()
+    langsmith_teardown.teardown(limiter=limiter)
+
+    expected = {f"/datasets/{d}" for d in datasets} | {f"/annotation-queues/{q}" for q in queues}
+    assert set(server.deleted) == expected
+    assert server.rejected > 0
+    assert limiter.rate_limited == server.rejected  # no 429 was retried inside the client
+    assert limiter.rate < langsmith_teardown.INITIAL_RATE
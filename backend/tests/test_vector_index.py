@@ -0,0 +1,64 @@
+"""IVF lists are built once per snapshot, not on every load."""
+
+import os
+
+import numpy as np
+import pytest
+
+import backend.vector_index as vector_index
+
+
+class _FakeCollection:
+    def __init__(self, vectors: np.ndarray) -> None:
+        self._vectors = vectors
+
+    def get(self, include: list[str]) -> dict:
+        return {
+            "embeddings": self._vectors,
+            "documents": [str(i) for i in range(len(self._vectors))],
+            "metadatas": [{"row": i} for i in range(len(self._vectors))],
+        }
+
+
+@pytest.fixture
+def vectors() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((40, 32), dtype=np.float32)
+    return centers[rng.integers(len(centers), size=2000)] + 0.3 * rng.standard_normal((2000, 32), dtype=np.float32)
+
+
+def _rows(results: list[list[tuple[int, float]]]) -> list[list[int]]:
+    return [[row for row, _ in hits] for hits in results]
+
+
+def _no_build(*args, **kwargs):
+    raise AssertionError("IVF rebuilt on load")
+
+
+def test_ivf_is_built_at_snapshot_time_and_loaded(vectors, tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX", "ivf")
+    path = vector_index.write_snapshot(_FakeCollection(vectors), "docs")
+    assert "ivf-44.npz" in os.listdir(path)  # sqrt(2000) lists
+
+    monkeypatch.setattr(vector_index, "build_ivf", _no_build)
+    ivf = vector_index.VectorIndex.load(path, kind="ivf")
+    exact = vector_index.VectorIndex.load(path)
+    assert len(ivf._lists) == 44
+    assert sorted(np.concatenate(ivf._lists)) == list(range(len(vectors)))
+    queries = vectors[:20]
+    assert [hits[0][0] for hits in ivf.search_batch(queries, 1)] == list(range(20))
+    assert _rows(ivf.search_batch(queries, 4)) == _rows(exact.search_batch(queries, 4))
+
+
+def test_older_snapshot_builds_ivf_once(vectors, tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX", "exact")
+    path = vector_index.write_snapshot(_FakeCollection(vectors), "docs")
+    assert not any(name.startswith("ivf-") for name in os.listdir(path))
+
+    first = vector_index.VectorIndex.load(path, kind="ivf", nlist=16)
+    assert "ivf-16.npz" in os.listdir(path)
+    monkeypatch.setattr(vector_index, "build_ivf", _no_build)
+    second = vector_index.VectorIndex.load(path, kind="ivf", nlist=16)
+    assert np.array_equal(first._centroids, second._centroids)
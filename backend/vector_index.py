@@ -0,0 +1,348 @@
+"""Optional in-process vector search over a snapshot of the Chroma collection.
+
+For this corpus size the Chroma client round trip dominates search time.
+``ingest.py`` writes a snapshot of the collection (a float32 ``.npy`` matrix
+plus documents/metadata), and the API answers queries from memory with
+either brute-force normalized dot products (``exact``) or an IVF index with
+a tunable number of probed lists (``ivf``). Large snapshots are
+memory-mapped instead of read into RAM. The IVF centroids and lists are
+built once per snapshot (by ``write_snapshot``, or by the first load of an
+older snapshot) and saved next to the vectors, so reloads never rerun
+k-means.
+
+Snapshots live in versioned directories under ``VECTOR_INDEX_DIR`` and are
+published by atomically replacing a ``CURRENT`` pointer file, so a running
+server can pick up a re-ingest without a restart.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.config import (
+    COLLECTION_NAME,
+    IVF_NLIST,
+    IVF_NPROBE,
+    VECTOR_INDEX,
+    VECTOR_INDEX_DIR,
+    VECTOR_INDEX_MMAP_ROWS,
+)
+
+logger = logging.getLogger(__name__)
+
+_POINTER = "CURRENT"
+_INLINE_ROWS = 50_000  # above this, run the matmul off the event loop
+_RELOAD_CHECK_INTERVAL = 1.0  # seconds between CURRENT pointer checks
+_CHUNK_ROWS = 65_536  # rows per block when scanning the whole matrix
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[-1])
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+def _nlist(nlist: int, n: int) -> int:
+    return max(1, min(nlist or int(np.sqrt(n)), n))
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(vectors[i:i + _CHUNK_ROWS] @ centroids.T, axis=1)
+        for i in range(0, vectors.shape[0], _CHUNK_ROWS)
+    ])
+
+
+def build_ivf(vectors: np.ndarray, nlist: int = IVF_NLIST, iterations: int = 10) -> dict[str, np.ndarray]:
+    """Spherical k-means coarse quantizer; each vector goes to one list.
+
+    Returns ``centroids`` plus the lists as ``order`` (row ids sorted by
+    list) and ``offsets`` (list *c* is ``order[offsets[c]:offsets[c + 1]]``).
+    Works through *vectors* a block at a time, so a memory-mapped matrix is
+    never copied whole.
+    """
+    n = vectors.shape[0]
+    nlist = _nlist(nlist, n)
+    rng = np.random.default_rng(0)
+    centroids = np.array(vectors[np.sort(rng.choice(n, nlist, replace=False))])
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids)
+        counts = np.zeros(nlist, dtype=np.int64)
+        for i in range(0, n, _CHUNK_ROWS):
+            block = vectors[i:i + _CHUNK_ROWS]
+            assign = np.argmax(block @ centroids.T, axis=1)
+            order = np.argsort(assign, kind="stable")
+            members, starts = np.unique(assign[order], return_index=True)
+            sums[members] += np.add.reduceat(block[order], starts, axis=0)
+            counts += np.bincount(assign, minlength=nlist)
+        sums[counts == 0] = centroids[counts == 0]  # empty lists keep their old centroid
+        centroids = _normalize(sums)
+    assign = _assign(vectors, centroids)
+    return {
+        "centroids": centroids,
+        "order": np.argsort(assign, kind="stable"),
+        "offsets": np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]),
+    }
+
+
+def _ivf_path(path: str, nlist: int) -> str:
+    return os.path.join(path, f"ivf-{nlist}.npz")
+
+
+def _save_ivf(path: str, ivf: dict[str, np.ndarray]) -> None:
+    target = _ivf_path(path, len(ivf["centroids"]))
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+    np.savez(tmp_path, **ivf)
+    os.replace(tmp_path, target)
+
+
+def _load_ivf(path: str, vectors: np.ndarray, nlist: int) -> dict[str, np.ndarray]:
+    """The snapshot's saved IVF for *nlist*, built and saved on first use."""
+    nlist = _nlist(nlist, vectors.shape[0])
+    try:
+        with np.load(_ivf_path(path, nlist)) as data:
+            return {name: data[name] for name in ("centroids", "order", "offsets")}
+    except FileNotFoundError:
+        pass
+    ivf = build_ivf(vectors, nlist)
+    try:
+        _save_ivf(path, ivf)
+    except OSError as e:
+        logger.warning(f"Could not save IVF lists to {path}: {e}")
+    return ivf
+
+
+class VectorIndex:
+    """In-memory index over normalized float32 vectors."""
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict],
+        kind: str = "exact",
+        nlist: int = IVF_NLIST,
+        nprobe: int = IVF_NPROBE,
+        version: str | None = None,
+        ivf: dict[str, np.ndarray] | None = None,
+    ) -> None:
+        if kind not in ("exact", "ivf"):
+            raise ValueError(f"Unknown vector index kind: {kind}")
+        self.vectors = vectors
+        self.documents = documents
+        self.metadatas = metadatas
+        self.kind = kind
+        self.nprobe = nprobe
+        self.version = version
+        self._queue: list[tuple[np.ndarray, int, asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+        if kind == "ivf":
+            ivf = ivf or build_ivf(vectors, nlist)
+            self._centroids = ivf["centroids"]
+            self._lists = np.split(ivf["order"], ivf["offsets"][1:-1])
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    @classmethod
+    def from_collection(cls, collection, **kwargs) -> "VectorIndex":
+        """Build an index straight from a Chroma collection."""
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        vectors = _normalize(np.asarray(data["embeddings"], dtype=np.float32))
+        return cls(vectors, data["documents"], data["metadatas"], **kwargs)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "VectorIndex":
+        """Load a snapshot directory written by :func:`write_snapshot`."""
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        if vectors.shape[0] <= VECTOR_INDEX_MMAP_ROWS:
+            vectors = np.ascontiguousarray(vectors)
+        with open(os.path.join(path, "docs.json")) as f:
+            docs = json.load(f)
+        if kwargs.get("kind") == "ivf":
+            kwargs["ivf"] = _load_ivf(path, vectors, kwargs.get("nlist", IVF_NLIST))
+        return cls(vectors, docs["documents"], docs["metadatas"], version=os.path.basename(path), **kwargs)
+
+    def search_batch(self, queries: np.ndarray, k: int) -> list[list[tuple[int, float]]]:
+        """Top-*k* (row, cosine score) pairs for each row of *queries*."""
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        results = []
+        if self.kind == "exact":
+            scores = queries @ self.vectors.T
+            for row in scores:
+                idx = _top_k(row, k)
+                results.append([(int(i), float(row[i])) for i in idx])
+            return results
+
+        probe = min(self.nprobe, len(self._lists))
+        centroid_scores = queries @ self._centroids.T
+        for query, row in zip(queries, centroid_scores):
+            lists = np.argpartition(-row, probe - 1)[:probe]
+            candidates = np.concatenate([self._lists[c] for c in lists])
+            if not len(candidates):
+                results.append([])
+                continue
+            scores = self.vectors[candidates] @ query
+            idx = _top_k(scores, k)
+            results.append([(int(candidates[i]), float(scores[i])) for i in idx])
+        return results
+
+    def _to_documents(self, hits: list[tuple[int, float]]) -> list[Document]:
+        return [
+            Document(page_content=self.documents[i], metadata={**(self.metadatas[i] or {}), "score": score})
+            for i, score in hits
+        ]
+
+    def search(self, query: list[float], k: int) -> list[Document]:
+        return self._to_documents(self.search_batch(np.asarray([query]), k)[0])
+
+    async def asearch(self, query: list[float], k: int) -> list[Document]:
+        """Search, sharing one matrix multiply with queries from the same loop tick."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((np.asarray(query, dtype=np.float32), k, future))
+        if len(self._queue) == 1:
+            # The task starts after callbacks already queued this tick, so
+            # queries resolved together upstream are searched together
+            self._flush_task = loop.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        batch, self._queue = self._queue, []
+        queries = np.stack([q for q, _, _ in batch])
+        k = max(k for _, k, _ in batch)
+        try:
+            if len(self) > _INLINE_ROWS:
+                hits = await asyncio.to_thread(self.search_batch, queries, k)
+            else:
+                hits = self.search_batch(queries, k)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, query_k, future), query_hits in zip(batch, hits):
+            if not future.done():
+                future.set_result(self._to_documents(query_hits[:query_k]))
+
+
+def snapshot_root(collection_name: str = COLLECTION_NAME) -> str:
+    return os.path.join(os.path.abspath(VECTOR_INDEX_DIR), collection_name)
+
+
+def current_snapshot(collection_name: str = COLLECTION_NAME) -> str | None:
+    """Path of the published snapshot, or None if there isn't one."""
+    root = snapshot_root(collection_name)
+    try:
+        with open(os.path.join(root, _POINTER)) as f:
+            return os.path.join(root, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshot(collection, collection_name: str = COLLECTION_NAME, keep: int = 2) -> str:
+    """Snapshot *collection* to disk and atomically publish it.
+
+    The new version is written to its own directory; only then is the
+    ``CURRENT`` pointer swapped with ``os.replace``. With ``VECTOR_INDEX=ivf``
+    the IVF lists are built and saved before publishing. The *keep* newest
+    versions are retained so readers mid-load never lose their files.
+    """
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+    vectors = _normalize(np.asarray(data["embeddings"], dtype=np.float32))
+
+    root = snapshot_root(collection_name)
+    version = f"v{time.time_ns()}"
+    path = os.path.join(root, version)
+    os.makedirs(path)
+    np.save(os.path.join(path, "vectors.npy"), vectors)
+    with open(os.path.join(path, "docs.json"), "w") as f:
+        json.dump({"documents": data["documents"], "metadatas": data["metadatas"]}, f)
+    if VECTOR_INDEX == "ivf" and len(vectors):
+        _save_ivf(path, build_ivf(vectors))
+
+    tmp_pointer = os.path.join(root, f".{_POINTER}.{version}")
+    with open(tmp_pointer, "w") as f:
+        f.write(version)
+    os.replace(tmp_pointer, os.path.join(root, _POINTER))
+
+    versions = sorted(d for d in os.listdir(root) if d.startswith("v"))
+    for old in versions[:-keep]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return path
+
+
+class IndexManager:
+    """Holds the live index and swaps in new snapshots as they are published.
+
+    Reloads happen on a background thread; searches keep using the old index
+    until the new one is fully loaded, then the reference is swapped.
+    """
+
+    def __init__(self, kind: str, collection_name: str = COLLECTION_NAME) -> None:
+        self.kind = kind
+        self.collection_name = collection_name
+        self.index: VectorIndex | None = None
+        self._checked_at = 0.0
+        self._loading = False
+        self._lock = threading.Lock()
+
+    def load(self) -> VectorIndex | None:
+        """Synchronously load the published snapshot (startup path)."""
+        path = current_snapshot(self.collection_name)
+        if path is not None:
+            self._load(path)
+        return self.index
+
+    def _load(self, path: str) -> None:
+        try:
+            start = time.perf_counter()
+            index = VectorIndex.load(path, kind=self.kind)
+            self.index = index
+            logger.info(
+                f"Vector index {index.version} loaded: {len(index)} vectors, "
+                f"kind={self.kind} ({(time.perf_counter() - start) * 1000:.0f}ms)"
+            )
+        except Exception as e:
+            logger.warning(f"Could not load vector index snapshot {path}: {e}")
+        finally:
+            self._loading = False
+
+    def get(self) -> VectorIndex | None:
+        """Current index; kicks off a background reload if a newer one is published."""
+        now = time.monotonic()
+        if now - self._checked_at >= _RELOAD_CHECK_INTERVAL:
+            self._checked_at = now
+            path = current_snapshot(self.collection_name)
+            version = os.path.basename(path) if path else None
+            current = self.index.version if self.index else None
+            if version and version != current:
+                with self._lock:
+                    if not self._loading:
+                        self._loading = True
+                        threading.Thread(target=self._load, args=(path,), daemon=True).start()
+        return self.index
+
+
+@lru_cache(maxsize=1)
+def get_index_manager() -> IndexManager | None:
+    """Process-wide index manager, or None when VECTOR_INDEX=chroma."""
+    if VECTOR_INDEX == "chroma":
+        return None
+    return IndexManager(VECTOR_INDEX)
@@ -22,10 +22,16 @@ export async function streamChat(
         feature_area: "general",
         thread_id: conversationId,
       },
+      stream_format: "compact",
     }),
     signal,
     openWhenHidden: true,
     onmessage(event) {
+      // Compact format: tokens arrive as a JSON string on a named "token" event
+      if (event.event === "token") {
+        onToken(JSON.parse(event.data));
+        return;
+      }
       if (!event.data) return;
       try {
         const data = JSON.parse(event.data);
@@ -1,2 +1,2 @@
 #!/usr/bin/env bash
-cd "$(dirname "$0")/backend" && uv run python -m seed.generate_dataset
+cd "$(dirname "$0")/backend" && uv run python -m seed.generate_dataset "$@"